@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from esquema import COLUNA_CENTAVOS, COLUNA_VALOR, em_reais
+
+# =================================================================
+# AGREGAÇÕES DOS DASHBOARDS
+# =================================================================
+# Cálculos do dashboard inteligente sem nada de Streamlit, para poderem ser
+# reaproveitados e medidos (benchmark.py) fora da página:
+# - pareto: concentração por estabelecimento
+# - evolucao / previsao: total por fatura e projeção do próximo mês
+# - outliers: compras acima de média + N desvios
+# - prioridade_gastos: score de prioridade por estabelecimento
+
+FAIXAS_PRIORIDADE = [(0.75, 'CRITICO'), (0.55, 'ALTO'), (0.35, 'MEDIO')]
+PRIORIDADE_PADRAO = 'BAIXO'
+ECONOMIA_POR_PRIORIDADE = {'CRITICO': 0.30, 'ALTO': 0.20, 'MEDIO': 0.10, 'BAIXO': 0.05}
+PESOS_SCORE = {'impacto_norm': 0.4, 'total_norm': 0.3, 'freq_norm': 0.2, 'media_norm': 0.1}
+
+
+def gastos_positivos(df):
+    return df[df[COLUNA_VALOR] > 0]
+
+
+def pareto(positivos, total_gasto=None):
+    """Gasto por Descrição em ordem decrescente, com % e % acumulado sobre o total."""
+    if total_gasto is None:
+        total_gasto = em_reais(positivos[COLUNA_CENTAVOS])
+    tabela = (
+        positivos.groupby('Descrição', observed=True)[COLUNA_VALOR].sum()
+        .sort_values(ascending=False).reset_index()
+    )
+    tabela['%'] = tabela[COLUNA_VALOR] / total_gasto * 100
+    tabela['%_acumulado'] = tabela['%'].cumsum()
+    return tabela
+
+
+def evolucao(df):
+    """Total de gastos positivos por fatura (Arquivo)."""
+    return gastos_positivos(df).groupby('Arquivo', observed=True)[COLUNA_VALOR].sum().reset_index()
+
+
+def previsao(tabela_evolucao):
+    """Média por fatura mais a tendência média entre faturas seguidas."""
+    valores = tabela_evolucao[COLUNA_VALOR]
+    return valores.mean() + valores.diff().mean()
+
+
+def outliers(positivos, desvios=2):
+    valores = positivos[COLUNA_VALOR]
+    return positivos[valores > valores.mean() + desvios * valores.std()]
+
+
+def _normalizar(coluna):
+    min_val = coluna.min()
+    max_val = coluna.max()
+
+    if max_val == min_val:
+        return coluna * 0
+
+    return (coluna - min_val) / (max_val - min_val)
+
+
+def prioridade_gastos(df):
+    """
+    Score de prioridade por Descrição (impacto mensal, total, frequência e
+    ticket médio normalizados), classificação CRITICO/ALTO/MEDIO/BAIXO e
+    economia mensal possível. Ordenado do maior score para o menor.
+    """
+    meses = df['Mes'] if 'Mes' in df.columns else df['Data'].dt.strftime('%Y-%m')
+
+    agrupado = df.assign(Mes=meses).groupby('Descrição', observed=True).agg(
+        total=(COLUNA_VALOR, 'sum'),
+        frequencia=(COLUNA_VALOR, 'count'),
+        media=(COLUNA_VALOR, 'mean'),
+        meses_unicos=('Mes', 'nunique'),
+        maior_compra=(COLUNA_VALOR, 'max')
+    )
+
+    # impacto mensal REAL
+    agrupado['impacto_mensal'] = agrupado['total'] / agrupado['meses_unicos']
+
+    agrupado['total_norm'] = _normalizar(agrupado['total'])
+    agrupado['freq_norm'] = _normalizar(agrupado['frequencia'])
+    agrupado['media_norm'] = _normalizar(agrupado['media'])
+    agrupado['impacto_norm'] = _normalizar(agrupado['impacto_mensal'])
+
+    agrupado['score'] = sum(peso * agrupado[coluna] for coluna, peso in PESOS_SCORE.items())
+
+    agrupado['prioridade'] = np.select(
+        [agrupado['score'] >= limite for limite, _ in FAIXAS_PRIORIDADE],
+        [rotulo for _, rotulo in FAIXAS_PRIORIDADE],
+        default=PRIORIDADE_PADRAO,
+    )
+    agrupado['economia_percentual'] = agrupado['prioridade'].map(ECONOMIA_POR_PRIORIDADE)
+    agrupado['economia_mensal'] = agrupado['impacto_mensal'] * agrupado['economia_percentual']
+
+    return agrupado.sort_values('score', ascending=False)
@@ -0,0 +1,148 @@
+import re
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from esquema import COLUNA_CENTAVOS, COLUNA_VALOR, DTYPES, aplicar_esquema
+
+# =================================================================
+# ARMAZENAMENTO COLUNAR (PARQUET PARTICIONADO POR MES_FATURA)
+# =================================================================
+# Além do CSV, a ETL grava uma cópia tipada em Parquet:
+#   gastos_consolidados_final.parquet/MES_FATURA=<fatura>/<arquivo>__<parte>-<i>.parquet
+# - Data como timestamp nativo, valores em centavos int64 (nada de reconverter texto)
+# - Arquivo/Descrição com dicionário (categorias), SEMANA_FATURA int8 (ver esquema.py)
+# - Um arquivo por fatura de origem, para o modo incremental trocar só o que mudou
+# Os dashboards leem daqui só as colunas e faturas que precisam.
+
+ARQUIVO_CSV = 'gastos_consolidados_final.csv'
+DIRETORIO_PARQUET = 'gastos_consolidados_final.parquet'
+COLUNA_PARTICAO = 'MES_FATURA'
+
+
+def parquet_disponivel():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _nome_seguro(arquivo):
+    return re.sub(r'[^A-Za-z0-9._-]', '_', str(arquivo))
+
+
+def _tipar(df):
+    # Só os centavos vão para o disco; 'Valor (R$)' é recalculado na leitura
+    df = aplicar_esquema(df).drop(columns=[COLUNA_VALOR])
+    df[COLUNA_PARTICAO] = df[COLUNA_PARTICAO].astype(str)
+    return df
+
+
+def limpar_parquet(destino=DIRETORIO_PARQUET):
+    """Apaga o dataset inteiro (usado antes de uma carga completa)."""
+    shutil.rmtree(destino, ignore_errors=True)
+
+
+def remover_arquivos_parquet(arquivos, destino=DIRETORIO_PARQUET):
+    """Remove, em todas as partições, os dados das faturas de origem indicadas."""
+    for arquivo in arquivos:
+        for caminho in Path(destino).glob(f"*/{_nome_seguro(arquivo)}__*.parquet"):
+            caminho.unlink()
+
+
+def gravar_parquet(df, destino=DIRETORIO_PARQUET, parte=0):
+    """
+    Grava `df` (já transformado pela ETL) no dataset particionado.
+    `parte` diferencia blocos sucessivos do modo streaming.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = _tipar(df)
+    for arquivo, grupo in df.groupby('Arquivo', sort=False, observed=True):
+        # Ordenado por data dentro de cada arquivo: estatísticas de row group úteis para filtros
+        grupo = grupo.sort_values('Data', kind='stable')
+        tabela = pa.Table.from_pandas(grupo, preserve_index=False)
+        pq.write_to_dataset(
+            tabela,
+            destino,
+            partition_cols=[COLUNA_PARTICAO],
+            basename_template=f"{_nome_seguro(arquivo)}__{parte}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+
+# =================================================================
+# LEITURA PARA OS DASHBOARDS
+# =================================================================
+
+def _valor_para_numero(serie):
+    # Só texto no formato brasileiro ("R$ 1.234,56") precisa de limpeza;
+    # números já lidos como float não podem perder o ponto decimal
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    serie = (
+        serie.astype(str)
+        .str.replace('R$', '', regex=False)
+        .str.replace('.', '', regex=False)
+        .str.replace(',', '.', regex=False)
+        .str.strip()
+    )
+    return pd.to_numeric(serie, errors='coerce')
+
+
+def _colunas_parquet(origem):
+    import pyarrow.dataset as ds
+    return ds.dataset(origem, format='parquet', partitioning='hive').schema.names
+
+
+def listar_arquivos(origem_parquet=DIRETORIO_PARQUET, origem_csv=ARQUIVO_CSV):
+    """Faturas de origem (coluna Arquivo) em ordem alfabética, lendo só essa coluna."""
+    if Path(origem_parquet).exists() and parquet_disponivel():
+        serie = pd.read_parquet(origem_parquet, columns=['Arquivo'])['Arquivo']
+    else:
+        serie = pd.read_csv(origem_csv, usecols=['Arquivo'])['Arquivo']
+    return sorted(serie.dropna().astype(str).unique().tolist())
+
+
+def carregar_gastos(colunas=None, arquivos=None, meses_fatura=None,
+                    origem_parquet=DIRETORIO_PARQUET, origem_csv=ARQUIVO_CSV):
+    """
+    Carrega a base consolidada já no esquema de esquema.py (Data datetime,
+    valores em centavos + 'Valor (R$)', categorias).
+
+    colunas      -- colunas desejadas; as que não existirem na base são ignoradas
+    arquivos     -- lista de faturas de origem (Arquivo) a manter
+    meses_fatura -- lista de MES_FATURA a manter (poda de partições)
+
+    Usa o Parquet quando existe; senão cai para o CSV.
+    """
+    if colunas is not None and COLUNA_VALOR in colunas:
+        colunas = list(colunas) + [COLUNA_CENTAVOS]
+
+    if Path(origem_parquet).exists() and parquet_disponivel():
+        if colunas is not None:
+            existentes = set(_colunas_parquet(origem_parquet))
+            colunas = [c for c in colunas if c in existentes]
+        filtros = []
+        if arquivos is not None:
+            filtros.append(('Arquivo', 'in', list(arquivos)))
+        if meses_fatura is not None:
+            filtros.append((COLUNA_PARTICAO, 'in', list(meses_fatura)))
+        df = pd.read_parquet(origem_parquet, columns=colunas, filters=filtros or None)
+        return aplicar_esquema(df)
+
+    if colunas is not None:
+        cabecalho = pd.read_csv(origem_csv, nrows=0).columns
+        colunas = [c for c in colunas if c in cabecalho]
+    df = pd.read_csv(origem_csv, usecols=colunas,
+                     dtype={c: t for c, t in DTYPES.items() if c != COLUNA_CENTAVOS})
+    if arquivos is not None:
+        df = df[df['Arquivo'].isin(arquivos)]
+    if meses_fatura is not None and COLUNA_PARTICAO in df.columns:
+        df = df[df[COLUNA_PARTICAO].isin(meses_fatura)]
+    if COLUNA_VALOR in df.columns:
+        df[COLUNA_VALOR] = _valor_para_numero(df[COLUNA_VALOR])
+    return aplicar_esquema(df.reset_index(drop=True))
@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+import analises
+import cubo_gastos
+from indice_linhas import IndiceLinhas
+from busca_estabelecimentos import IndiceTrigramas
+from entidades import IndiceEntidades
+from consultas import MotorConsultas, PlanoConsulta
+from pareto_gastos import Pareto
+from periodos_fatura import PeriodosFatura
+from cache_dados import preparar_base
+from datas_fatura import limpar_memo
+from esquema import aplicar_esquema
+from etl_fatura import ConfiguracaoETL, ETAPAS, executar
+from gerador_sintetico import ESCALAS, SEMENTE, gerar_gastos
+
+# =================================================================
+# BENCHMARK DA ETL E DAS AGREGAÇÕES DOS DASHBOARDS
+# =================================================================
+# Para cada escala (10k, 1M, 10M linhas sintéticas) mede:
+#   etl[.<etapa>]  ETL em memória (etl_fatura), total e por etapa
+#   esquema        tipagem da base como os dashboards carregam (aplicar_esquema + preparar_base)
+#   pareto, evolucao, outliers, prioridade   agregações de analises.py
+#   cubo, <agregação>.cubo                   montagem do cubo e roll-ups (cubo_gastos.py)
+#   pareto.top10                             top 10 por seleção parcial (pareto_gastos.py)
+#   periodos                                 tabela por fatura na ordem do ciclo (periodos_fatura.py)
+#   filtro, indice, filtro.indice            seleção de uma fatura (máscara x indice_linhas.py)
+#   busca, busca.indice                      busca de estabelecimento (str.contains x busca_estabelecimentos.py)
+#   entidades, entidades.indice              estabelecimentos citados numa pergunta (laço nos nomes x entidades.py)
+#   consulta, consulta.motor                 total de um estabelecimento num período, por semana (pandas x consultas.py)
+# Cada medida é o melhor de N repetições (memo de datas limpo antes de cada
+# uma). Os resultados são anexados a resultados_benchmark.jsonl e comparados
+# com a execução anterior na mesma escala: medidas mais lentas que a
+# tolerância são marcadas como REGRESSÃO (código de saída 1).
+# Uso: python benchmark.py [--escalas 10k 1M 10M] [--repeticoes 3]
+
+DIRETORIO_DADOS = '.benchmark'
+ARQUIVO_RESULTADOS = 'resultados_benchmark.jsonl'
+ESCALAS_PADRAO = ['10k', '1M']
+REPETICOES = 3
+TOLERANCIA = 0.20  # 20% mais lento que a execução anterior = regressão
+MINIMO_SEGUNDOS = 0.05  # abaixo disso a variação é ruído
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _dados(escala, semente, diretorio=DIRETORIO_DADOS):
+    """CSV sintético da escala, gerado uma vez e reaproveitado entre execuções."""
+    caminho = Path(diretorio) / f"gastos_{escala}_s{semente}.csv"
+    if not caminho.exists():
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        print(f"   gerando {ESCALAS[escala]:,} linhas em {caminho}...")
+        temporario = caminho.with_suffix('.tmp')
+        gerar_gastos(temporario, ESCALAS[escala], semente)
+        temporario.replace(caminho)
+    return caminho
+
+
+def _cronometrar(funcao, repeticoes):
+    """Melhor tempo de `repeticoes` chamadas e o resultado da última."""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        limpar_memo()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def medir_escala(escala, repeticoes=REPETICOES, semente=SEMENTE, diretorio=DIRETORIO_DADOS):
+    """Medidas (segundos) de uma escala: {'etl': ..., 'etl.carga': ..., 'pareto': ..., ...}."""
+    entrada = _dados(escala, semente, diretorio)
+    cfg = ConfiguracaoETL(
+        arquivo_entrada=str(entrada),
+        arquivo_saida=str(Path(diretorio) / f"final_{escala}.csv"),
+        gerar_parquet=False,
+        quiet=True,
+    )
+    medidas = {}
+
+    # ETL: guarda o relatório de etapas da repetição mais rápida
+    melhor_etl = None
+    for _ in range(repeticoes):
+        limpar_memo()
+        df, _, _, relatorio = executar(cfg, 'memoria')
+        if melhor_etl is None or relatorio.total_segundos < melhor_etl.total_segundos:
+            melhor_etl = relatorio
+    medidas['etl'] = melhor_etl.total_segundos
+    for etapa in ETAPAS:
+        medidas[f'etl.{etapa}'] = melhor_etl.segundos[etapa]
+
+    medidas['esquema'], base = _cronometrar(lambda: preparar_base(aplicar_esquema(df)), repeticoes)
+    positivos = analises.gastos_positivos(base)
+
+    medidas['pareto'], _ = _cronometrar(lambda: analises.pareto(positivos), repeticoes)
+    medidas['evolucao'], _ = _cronometrar(
+        lambda: analises.previsao(analises.evolucao(base)), repeticoes
+    )
+    medidas['outliers'], _ = _cronometrar(lambda: analises.outliers(positivos), repeticoes)
+    medidas['prioridade'], _ = _cronometrar(lambda: analises.prioridade_gastos(base), repeticoes)
+
+    medidas['cubo'], cubo = _cronometrar(lambda: cubo_gastos.montar_cubo(base), repeticoes)
+    medidas['kpis.cubo'], _ = _cronometrar(lambda: cubo_gastos.kpis(cubo), repeticoes)
+    medidas['pareto.cubo'], _ = _cronometrar(lambda: cubo_gastos.pareto(cubo), repeticoes)
+    medidas['evolucao.cubo'], _ = _cronometrar(lambda: cubo_gastos.por(cubo, 'Arquivo'), repeticoes)
+    medidas['pareto.top10'], _ = _cronometrar(lambda: Pareto(cubo).top(10), repeticoes)
+    medidas['periodos'], _ = _cronometrar(lambda: PeriodosFatura(base), repeticoes)
+
+    # Uma fatura, só gastos positivos (o que os dashboards fazem a cada interação)
+    fatura = base['Arquivo'].cat.categories[0]
+    medidas['filtro'], _ = _cronometrar(
+        lambda: base[(base['Arquivo'] == fatura) & (base['Valor (R$)'] > 0)], repeticoes
+    )
+    medidas['indice'], indice = _cronometrar(lambda: IndiceLinhas(base), repeticoes)
+    medidas['filtro.indice'], _ = _cronometrar(
+        lambda: indice.selecionar(base, arquivo=fatura, positivos=True), repeticoes
+    )
+
+    # Busca de estabelecimento na tabela de transações
+    medidas['busca'], _ = _cronometrar(
+        lambda: base[base['Descrição'].str.contains('shop', case=False, na=False, regex=False)], repeticoes
+    )
+    busca = IndiceTrigramas(base['Descrição'].cat.categories)
+    medidas['busca.indice'], _ = _cronometrar(lambda: busca.filtrar(base, 'shop'), repeticoes)
+
+    # Estabelecimentos citados numa pergunta do assistente
+    pergunta = f"quanto gastei em {base['Descrição'].cat.categories[-1]}".lower()
+    medidas['entidades'], _ = _cronometrar(
+        lambda: [d for d in base['Descrição'].unique() if str(d).lower() in pergunta], repeticoes
+    )
+    entidades = IndiceEntidades(base)
+    medidas['entidades.indice'], _ = _cronometrar(lambda: entidades.encontrar(pergunta), repeticoes)
+
+    # Pergunta com entidade, período e agrupamento ("quanto gastei com X entre ... por semana")
+    descricao = base['Descrição'].cat.categories[0]
+    meses = base['Data'].dt.year * 12 + base['Data'].dt.month - 1
+    inicio, fim = int(meses.min()), int(meses.min()) + 3
+
+    def consulta_pandas():
+        recorte = positivos[positivos['Descrição'].str.contains(descricao, case=False, na=False, regex=False)]
+        mes = meses.loc[recorte.index]
+        recorte = recorte[(mes >= inicio) & (mes <= fim)]
+        return recorte.groupby('SEMANA_FATURA')['Valor (R$)'].agg(['sum', 'count', 'mean', 'max'])
+
+    medidas['consulta'], _ = _cronometrar(consulta_pandas, repeticoes)
+    motor = MotorConsultas(base)
+    plano = PlanoConsulta('soma', [('Descrição', descricao)], (inicio, fim, 'Data'), 'SEMANA_FATURA')
+    medidas['consulta.motor'], _ = _cronometrar(lambda: motor.executar(plano), repeticoes)
+
+    return len(df), medidas
+
+
+def _ultima_execucao(arquivo_resultados, escala):
+    """Medidas da execução registrada mais recente para a escala."""
+    if not Path(arquivo_resultados).exists():
+        return {}
+    anteriores = {}
+    execucao = None
+    with open(arquivo_resultados, encoding='utf-8') as f:
+        for linha in f:
+            registro = json.loads(linha)
+            if registro['escala'] != escala:
+                continue
+            if registro['execucao'] != execucao:
+                execucao, anteriores = registro['execucao'], {}
+            anteriores[registro['medida']] = registro['segundos']
+    return anteriores
+
+
+def comparar(medidas, anteriores, tolerancia=TOLERANCIA):
+    tabela = pd.DataFrame({'segundos': pd.Series(medidas), 'anterior': pd.Series(anteriores, dtype='float64')})
+    tabela = tabela.loc[list(medidas)]
+    tabela['variacao_%'] = (tabela['segundos'] / tabela['anterior'] - 1) * 100
+    tabela['regressao'] = (
+        (tabela['segundos'] > tabela['anterior'] * (1 + tolerancia))
+        & (tabela['segundos'] > MINIMO_SEGUNDOS)
+    )
+    return tabela
+
+
+def registrar(arquivo_resultados, execucao, escala, linhas, medidas, repeticoes):
+    ambiente = {
+        'commit': _commit_atual(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'maquina': f"{platform.machine()} ({os.cpu_count()} núcleos)",
+    }
+    with open(arquivo_resultados, 'a', encoding='utf-8') as f:
+        for medida, segundos in medidas.items():
+            registro = {'execucao': execucao, 'escala': escala, 'linhas': linhas, 'medida': medida,
+                        'segundos': round(segundos, 6), 'repeticoes': repeticoes, **ambiente}
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+# ----------------- INÍCIO DA EXECUÇÃO -----------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark da ETL e dos dashboards em dados sintéticos")
+    parser.add_argument('--escalas', nargs='+', choices=list(ESCALAS), default=ESCALAS_PADRAO,
+                        help="escalas medidas (padrão: %(default)s)")
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES, help="repetições por medida (padrão: %(default)s)")
+    parser.add_argument('--semente', type=int, default=SEMENTE, help="semente dos dados sintéticos (padrão: %(default)s)")
+    parser.add_argument('--resultados', default=ARQUIVO_RESULTADOS, help="histórico de resultados (padrão: %(default)s)")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help="fração mais lenta que a execução anterior tratada como regressão (padrão: %(default)s)")
+    parser.add_argument('--nao-registrar', action='store_true', help="só compara, sem anexar ao histórico")
+    args = parser.parse_args()
+
+    execucao = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    regressoes = 0
+
+    for escala in args.escalas:
+        print(f"\n>>> Escala {escala} <<<")
+        linhas, medidas = medir_escala(escala, args.repeticoes, args.semente)
+        tabela = comparar(medidas, _ultima_execucao(args.resultados, escala), args.tolerancia)
+        regressoes += int(tabela['regressao'].sum())
+
+        tabela['regressao'] = tabela['regressao'].map({True: 'REGRESSÃO', False: ''})
+        print(f"{linhas:,} linhas, melhor de {args.repeticoes}")
+        print(tabela.to_string(float_format=lambda x: f"{x:.4f}", na_rep='-'))
+
+        if not args.nao_registrar:
+            registrar(args.resultados, execucao, escala, linhas, medidas, args.repeticoes)
+
+    if regressoes:
+        print(f"\nATENÇÃO: {regressoes} medida(s) mais lenta(s) que a execução anterior "
+              f"(tolerância {args.tolerancia:.0%}).")
+    raise SystemExit(1 if regressoes else 0)
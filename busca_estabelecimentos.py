@@ -0,0 +1,141 @@
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from cache_dados import derivado
+
+# =================================================================
+# BUSCA DE ESTABELECIMENTOS (ÍNDICE INVERTIDO DE TRIGRAMAS)
+# =================================================================
+# O índice é montado uma vez por versão da base sobre as Descrições
+# distintas (algumas centenas/milhares), não sobre as transações:
+#   trigrama -> ids das descrições que o contêm
+# Uma busca intersecta as listas dos trigramas da consulta, confere só as
+# descrições candidatas e volta às linhas pelos códigos da coluna categórica.
+# Modos:
+#   contem     substring, sem diferenciar maiúsculas (texto literal, não regex)
+#   prefixo    descrição começa com a consulta
+#   aproximado tolera erros de digitação: fração dos trigramas da consulta
+#              presentes na descrição >= SIMILARIDADE_MINIMA
+
+MODOS_BUSCA = ['contem', 'prefixo', 'aproximado']
+# Rótulo na tela -> modo
+ROTULOS_BUSCA = {'contém': 'contem', 'começa com': 'prefixo', 'aproximado': 'aproximado'}
+SIMILARIDADE_MINIMA = 0.5
+_VAZIO = np.array([], dtype=np.int32)
+
+
+def _normalizar(texto):
+    return str(texto).casefold()
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTrigramas:
+    """Índice invertido de trigramas sobre uma lista de descrições distintas."""
+
+    def __init__(self, valores):
+        self.valores = pd.Index(valores)
+        self.normalizados = [_normalizar(v) for v in self.valores]
+
+        postings = defaultdict(list)
+        for i, texto in enumerate(self.normalizados):
+            for trigrama in _trigramas(texto):
+                postings[trigrama].append(i)
+        self.postings = {t: np.array(ids, dtype=np.int32) for t, ids in postings.items()}
+
+        # Ordem alfabética (normalizada) para o modo prefixo
+        self._ordem = sorted(range(len(self.normalizados)), key=self.normalizados.__getitem__)
+        self._ordenados = [self.normalizados[i] for i in self._ordem]
+
+    def __len__(self):
+        return len(self.valores)
+
+    def __repr__(self):
+        return f"IndiceTrigramas({len(self)} descrições, {len(self.postings)} trigramas)"
+
+    def _candidatos(self, consulta):
+        trigramas = _trigramas(consulta)
+        if not trigramas:
+            # Consulta com menos de 3 letras: confere todas as descrições distintas
+            return np.arange(len(self.valores))
+        listas = sorted((self.postings.get(t, _VAZIO) for t in trigramas), key=len)
+        candidatos = listas[0]
+        for lista in listas[1:]:
+            if not len(candidatos):
+                break
+            candidatos = np.intersect1d(candidatos, lista, assume_unique=True)
+        return candidatos
+
+    def _contem(self, consulta):
+        return [int(i) for i in self._candidatos(consulta) if consulta in self.normalizados[i]]
+
+    def _prefixo(self, consulta):
+        ids = []
+        for posicao in range(bisect_left(self._ordenados, consulta), len(self._ordenados)):
+            if not self._ordenados[posicao].startswith(consulta):
+                break
+            ids.append(self._ordem[posicao])
+        return sorted(ids)
+
+    def _aproximado(self, consulta, similaridade_minima):
+        trigramas = _trigramas(consulta)
+        if len(trigramas) < 3:
+            # Consulta curta demais para medir semelhança: cai na busca por substring
+            return self._contem(consulta)
+        listas = [self.postings[t] for t in trigramas if t in self.postings]
+        if not listas:
+            return []
+        # Quantos trigramas da consulta cada descrição tem
+        comuns = np.bincount(np.concatenate(listas), minlength=len(self.valores))
+        similaridade = comuns / len(trigramas)
+        ids = np.flatnonzero(similaridade >= similaridade_minima)
+        # Mais parecidas primeiro
+        return [int(i) for i in ids[np.argsort(-similaridade[ids], kind='stable')]]
+
+    def buscar(self, consulta, modo='contem', similaridade_minima=SIMILARIDADE_MINIMA):
+        """Ids (posições em `valores`) das descrições encontradas."""
+        if modo not in MODOS_BUSCA:
+            raise ValueError(f"modo de busca desconhecido: {modo!r} (use um de {', '.join(MODOS_BUSCA)})")
+        consulta = _normalizar(consulta)
+        if not consulta:
+            return list(range(len(self.valores)))
+        if modo == 'prefixo':
+            return self._prefixo(consulta)
+        if modo == 'aproximado':
+            return self._aproximado(consulta, similaridade_minima)
+        return self._contem(consulta)
+
+    def descricoes(self, consulta, modo='contem'):
+        """Descrições encontradas (no modo aproximado, das mais parecidas para as menos)."""
+        return self.valores[self.buscar(consulta, modo)]
+
+    def filtrar(self, df, consulta, modo='contem', coluna='Descrição'):
+        """
+        Linhas de `df` cuja `coluna` foi encontrada pela busca. Com a coluna
+        categórica usa só os códigos inteiros (sem comparar texto por linha).
+        """
+        encontradas = self.descricoes(consulta, modo)
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.categories.get_indexer(encontradas)
+            # Tabela código -> encontrada; a última posição atende o código -1 (vazio)
+            tabela = np.zeros(len(serie.cat.categories) + 1, dtype=bool)
+            tabela[codigos[codigos >= 0]] = True
+            return df[tabela[serie.cat.codes.to_numpy()]]
+        return df[serie.isin(encontradas)]
+
+
+def indice_busca(colunas=None):
+    """Índice das descrições da base em cache, reconstruído só quando a base muda."""
+    def construir(base):
+        serie = base['Descrição']
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            return IndiceTrigramas(serie.cat.categories)
+        return IndiceTrigramas(serie.dropna().unique())
+
+    return derivado('busca_estabelecimentos', construir, colunas)
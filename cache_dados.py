@@ -0,0 +1,170 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from armazenamento import carregar_gastos, parquet_disponivel, ARQUIVO_CSV, DIRETORIO_PARQUET
+
+# =================================================================
+# CACHE COMPARTILHADO DA BASE DOS DASHBOARDS
+# =================================================================
+# Os três dashboards carregam a base por aqui. A base tipada (com Mes e
+# Dia_Semana) fica em memória uma vez por processo, compartilhada por todas
+# as sessões e reruns do Streamlit, e é versionada pela fonte:
+# - a cada chamada só se consulta mtime/tamanho dos arquivos (os.stat)
+# - se mudaram, calcula-se o SHA-256 do conteúdo; conteúdo diferente =
+#   nova versão, a base é relida; igual (ETL regravou o mesmo) = mantém
+# A fonte é a mesma de carregar_gastos: o dataset Parquet se existir, senão o CSV.
+# Estruturas calculadas a partir da base (cubo, índices) ficam junto dela via
+# `derivado` e são descartadas quando a base muda de versão; resultados que
+# dependem também de um filtro (fatura, categoria) ficam num LRU por versão
+# (`derivado_por_chave`).
+
+_trava = threading.RLock()
+_bases = {}  # (colunas, origens) -> {'assinatura', 'versao', 'df', 'derivados'}
+_estatisticas = {'acertos': 0, 'recargas': 0, 'hashes': 0}
+
+
+def _arquivos_fonte(origem_parquet, origem_csv):
+    if Path(origem_parquet).exists() and parquet_disponivel():
+        return sorted(Path(origem_parquet).rglob('*.parquet'))
+    return [Path(origem_csv)]
+
+
+def _assinatura(arquivos):
+    """(caminho, mtime, tamanho) de cada arquivo da fonte; barato, sem ler conteúdo."""
+    assinatura = []
+    for caminho in arquivos:
+        info = caminho.stat()
+        assinatura.append((str(caminho), info.st_mtime_ns, info.st_size))
+    return tuple(assinatura)
+
+
+def _hash_conteudo(arquivos):
+    h = hashlib.sha256()
+    for caminho in arquivos:
+        h.update(str(caminho.name).encode())
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloco)
+    _estatisticas['hashes'] += 1
+    return h.hexdigest()
+
+
+def _por_data_unica(datas, transformar):
+    """
+    Aplica `transformar` (DatetimeIndex -> valores) só às datas distintas e
+    devolve uma coluna categórica alinhada a `datas`.
+    """
+    codigos, unicas = pd.factorize(datas, use_na_sentinel=False)
+    unicas = pd.DatetimeIndex(unicas)
+    if unicas.tz is not None:
+        unicas = unicas.tz_localize(None)
+    codigos_valor, categorias = pd.factorize(pd.Index(transformar(unicas)), sort=True)
+    return pd.Categorical.from_codes(codigos_valor[codigos], categories=categorias)
+
+
+def _chave(colunas, origem_parquet, origem_csv):
+    return (tuple(colunas) if colunas is not None else None, str(origem_parquet), str(origem_csv))
+
+
+def preparar_base(df):
+    """Colunas derivadas usadas pelos dashboards, calculadas por data distinta."""
+    if 'Data' in df.columns:
+        df['Mes'] = _por_data_unica(df['Data'], lambda d: d.to_period('M').astype(str))
+        df['Dia_Semana'] = _por_data_unica(df['Data'], lambda d: d.day_name())
+    return df
+
+
+def carregar_base(colunas=None, arquivos=None, origem_parquet=DIRETORIO_PARQUET, origem_csv=ARQUIVO_CSV):
+    """
+    Base dos dashboards (esquema de esquema.py + Mes/Dia_Semana), servida do
+    cache do processo enquanto a fonte não mudar. `arquivos` filtra as faturas
+    em memória. Devolve uma cópia rasa: o chamador pode criar colunas sem
+    afetar o cache, mas não deve alterar valores no lugar.
+    """
+    entrada = _entrada(colunas, origem_parquet, origem_csv)
+    df = entrada['df']
+
+    if arquivos is not None:
+        df = df[df['Arquivo'].isin(arquivos)].reset_index(drop=True)
+    return df.copy(deep=False)
+
+
+def _entrada(colunas, origem_parquet, origem_csv):
+    """Entrada do cache para a versão atual da fonte (recarrega se preciso)."""
+    chave = _chave(colunas, origem_parquet, origem_csv)
+    fonte = _arquivos_fonte(origem_parquet, origem_csv)
+    assinatura = _assinatura(fonte)
+
+    with _trava:
+        entrada = _bases.get(chave)
+        if entrada is None or entrada['assinatura'] != assinatura:
+            versao = _hash_conteudo(fonte)
+            if entrada is not None and entrada['versao'] == versao:
+                entrada['assinatura'] = assinatura
+                _estatisticas['acertos'] += 1
+            else:
+                df = carregar_gastos(colunas, origem_parquet=origem_parquet, origem_csv=origem_csv)
+                entrada = {'assinatura': assinatura, 'versao': versao, 'df': preparar_base(df), 'derivados': {}}
+                _bases[chave] = entrada
+                _estatisticas['recargas'] += 1
+        else:
+            _estatisticas['acertos'] += 1
+    return entrada
+
+
+def listar_faturas(colunas=None, origem_parquet=DIRETORIO_PARQUET, origem_csv=ARQUIVO_CSV):
+    """Faturas (Arquivo) da base em cache, em ordem alfabética."""
+    df = carregar_base(colunas, origem_parquet=origem_parquet, origem_csv=origem_csv)
+    return sorted(str(arquivo) for arquivo in df['Arquivo'].dropna().unique())
+
+
+def versao_base(colunas=None, origem_parquet=DIRETORIO_PARQUET, origem_csv=ARQUIVO_CSV):
+    """Hash do conteúdo da versão em cache (útil como chave de caches derivados)."""
+    return _entrada(colunas, origem_parquet, origem_csv)['versao']
+
+
+def derivado(nome, construir, colunas=None, origem_parquet=DIRETORIO_PARQUET, origem_csv=ARQUIVO_CSV):
+    """
+    `construir(base)` calculado uma vez por versão da base e guardado com ela
+    (ex.: cubo de agregados, índices). Quem usa não deve alterar o resultado.
+    """
+    entrada = _entrada(colunas, origem_parquet, origem_csv)
+    with _trava:
+        if nome not in entrada['derivados']:
+            entrada['derivados'][nome] = construir(entrada['df'])
+        return entrada['derivados'][nome]
+
+
+def derivado_por_chave(nome, chave, construir, colunas=None, maximo=32,
+                       origem_parquet=DIRETORIO_PARQUET, origem_csv=ARQUIVO_CSV):
+    """
+    `construir()` calculado uma vez por (versão da base, `chave`) e guardado
+    num LRU de até `maximo` chaves, descartado junto com a versão da base.
+    """
+    memo = derivado(nome, lambda base: OrderedDict(), colunas, origem_parquet, origem_csv)
+    with _trava:
+        if chave in memo:
+            memo.move_to_end(chave)
+            return memo[chave]
+
+    # Calculado fora da trava: outras sessões não esperam por este resultado
+    valor = construir()
+    with _trava:
+        memo[chave] = valor
+        memo.move_to_end(chave)
+        while len(memo) > maximo:
+            memo.popitem(last=False)
+    return valor
+
+
+def estatisticas():
+    return dict(_estatisticas)
+
+
+def limpar_cache():
+    with _trava:
+        _bases.clear()
@@ -0,0 +1,82 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from cache_dados import derivado
+from intencoes import dobrar_acentos
+
+# =================================================================
+# CACHE DE RESPOSTAS DOS ASSISTENTES
+# =================================================================
+# A resposta de cada pergunta fica guardada por (pergunta normalizada,
+# filtros ativos) num LRU com validade (TTL), um por assistente e por versão
+# da base (cache_dados.derivado): quando a ETL regrava a base, as respostas
+# antigas vão junto. A pergunta é normalizada sem acentos, em minúsculas e só
+# com as palavras ("Quanto gastei?" == "quanto  gastei"), então a mesma
+# pergunta repetida, por qualquer sessão, não refaz filtro nem agregação.
+# Os agregados intermediários que as respostas usam ficam em
+# cache_dados.derivado_por_chave, nos próprios dashboards.
+# Acertos, faltas, expiradas e descartadas somam em `estatisticas()`.
+
+MAXIMO_RESPOSTAS = 256
+VALIDADE_SEGUNDOS = 15 * 60
+
+_trava = threading.RLock()
+_estatisticas = {'acertos': 0, 'faltas': 0, 'expiradas': 0, 'descartadas': 0}
+
+
+def normalizar_pergunta(pergunta):
+    """'  Quanto GASTEI no mês?' -> 'quanto gastei no mes'."""
+    return ' '.join(re.findall(r'\w+', dobrar_acentos(pergunta)))
+
+
+class CacheRespostas:
+    """LRU de até `maximo` respostas, cada uma válida por `validade` segundos."""
+
+    def __init__(self, maximo=MAXIMO_RESPOSTAS, validade=VALIDADE_SEGUNDOS, relogio=time.monotonic):
+        self.maximo = maximo
+        self.validade = validade
+        self._relogio = relogio
+        self._itens = OrderedDict()  # chave -> (instante, resposta)
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave, responder):
+        """Resposta guardada para `chave` ou, se não houver (ou venceu), `responder()`."""
+        with _trava:
+            item = self._itens.get(chave)
+            if item is not None:
+                instante, resposta = item
+                if self._relogio() - instante <= self.validade:
+                    self._itens.move_to_end(chave)
+                    _estatisticas['acertos'] += 1
+                    return resposta
+                del self._itens[chave]
+                _estatisticas['expiradas'] += 1
+            _estatisticas['faltas'] += 1
+
+        # Calculada fora da trava: outras sessões não esperam por esta resposta
+        resposta = responder()
+        with _trava:
+            self._itens[chave] = (self._relogio(), resposta)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+                _estatisticas['descartadas'] += 1
+        return resposta
+
+
+def resposta_em_cache(assistente, pergunta, filtros, responder, colunas=None):
+    """
+    Resposta de `pergunta` com os `filtros` ativos (hashable) no cache do
+    `assistente` para a versão atual da base; `responder()` só roda na falta.
+    """
+    cache = derivado(f'respostas_{assistente}', lambda base: CacheRespostas(), colunas)
+    return cache.obter((normalizar_pergunta(pergunta), filtros), responder)
+
+
+def estatisticas():
+    with _trava:
+        return dict(_estatisticas)
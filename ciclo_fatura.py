@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# =================================================================
+# CALENDÁRIO DE CICLOS DA FATURA
+# =================================================================
+# Cada fatura fecha no dia DIA_FECHAMENTO e cobre os gastos desde o dia
+# seguinte ao fechamento anterior. Com fechamento no dia 3:
+#   Fatura 2025-01 (JAN) = gastos de 04/12/2024 a 03/01/2025
+#   Fatura 2025-02 (FEV) = gastos de 04/01/2025 a 03/02/2025
+
+DIA_FECHAMENTO = 3
+ROTULO_SEM_FATURA = '0'  # mesmo valor que o np.select antigo deixava fora dos intervalos
+MESES_ABREV = ['JAN', 'FEV', 'MAR', 'ABR', 'MAI', 'JUN', 'JUL', 'AGO', 'SET', 'OUT', 'NOV', 'DEZ']
+
+
+def _data_fechamento(ano, mes, dia_fechamento):
+    # Meses curtos: fechamento no dia 31 vira o último dia do mês
+    ultimo_dia = pd.Timestamp(year=ano, month=mes, day=1).days_in_month
+    return pd.Timestamp(year=ano, month=mes, day=min(dia_fechamento, ultimo_dia))
+
+
+class CalendarioFatura:
+    """
+    Ciclos de fatura contíguos gerados a partir do dia de fechamento.
+
+    Os inícios dos ciclos ficam num array ordenado, então rotular N datas é
+    um único `searchsorted` (O(N log K)), para qualquer quantidade de anos.
+    """
+
+    def __init__(self, inicio, fim, dia_fechamento=DIA_FECHAMENTO, tz='UTC'):
+        inicio = pd.Timestamp(inicio)
+        fim = pd.Timestamp(fim)
+        if inicio.tzinfo is not None:
+            inicio = inicio.tz_convert(tz).tz_localize(None)
+        if fim.tzinfo is not None:
+            fim = fim.tz_convert(tz).tz_localize(None)
+
+        self.dia_fechamento = dia_fechamento
+        self.tz = tz
+
+        # Primeira fatura: a que fecha no mês de `inicio` (ou no seguinte, se
+        # `inicio` já passou do fechamento). Última: a que contém `fim`.
+        ano, mes = inicio.year, inicio.month
+        if inicio > _data_fechamento(ano, mes, dia_fechamento):
+            ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+        fechamentos = []
+        rotulos = []
+        while True:
+            fechamento = _data_fechamento(ano, mes, dia_fechamento)
+            fechamentos.append(fechamento)
+            rotulos.append(f"{ano}-{mes:02d} ({MESES_ABREV[mes - 1]})")
+            if fechamento >= fim:
+                break
+            ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+        fechamentos = pd.DatetimeIndex(fechamentos)
+        anterior = _data_fechamento(*(
+            (fechamentos[0].year - 1, 12) if fechamentos[0].month == 1
+            else (fechamentos[0].year, fechamentos[0].month - 1)
+        ), dia_fechamento)
+
+        # Ciclo i = [inicios[i], inicios[i + 1]) em dias inteiros
+        self.inicios = pd.DatetimeIndex([anterior]).append(fechamentos) + pd.Timedelta(days=1)
+        self.rotulos = rotulos
+
+    @classmethod
+    def para_datas(cls, datas, dia_fechamento=DIA_FECHAMENTO, tz='UTC'):
+        """Calendário que cobre do menor ao maior valor de `datas`."""
+        datas = pd.Series(datas)
+        if datas.notna().sum() == 0:
+            hoje = pd.Timestamp.today().normalize()
+            return cls(hoje, hoje, dia_fechamento, tz)
+        return cls(datas.min(), datas.max(), dia_fechamento, tz)
+
+    def __len__(self):
+        return len(self.rotulos)
+
+    def __repr__(self):
+        return (f"CalendarioFatura({self.rotulos[0]} .. {self.rotulos[-1]}, "
+                f"fechamento dia {self.dia_fechamento}, {len(self)} ciclos)")
+
+    @property
+    def intervalos(self):
+        """IntervalIndex [início, próximo início) de cada ciclo, com os rótulos das faturas."""
+        return pd.IntervalIndex.from_breaks(self.inicios, closed='left', name='MES_FATURA')
+
+    def tabela(self):
+        """DataFrame com início, fim (inclusivo) e rótulo de cada ciclo."""
+        return pd.DataFrame({
+            'MES_FATURA': self.rotulos,
+            'INICIO': self.inicios[:-1],
+            'FIM': self.inicios[1:] - pd.Timedelta(days=1),
+        })
+
+    def codigos(self, datas):
+        """Posição do ciclo de cada data (-1 para NaT ou fora do calendário)."""
+        datas = pd.DatetimeIndex(pd.Series(datas))
+        if datas.tz is not None:
+            datas = datas.tz_convert(self.tz).tz_localize(None)
+
+        codigos = self.inicios.searchsorted(datas, side='right') - 1
+        fora = (codigos >= len(self.rotulos)) | np.asarray(datas.isna())
+        codigos[fora] = -1
+        return codigos
+
+    def atribuir(self, datas, rotulo_padrao=ROTULO_SEM_FATURA):
+        """
+        Rótulo MES_FATURA de cada data como Categorical ordenado pelo ciclo.
+        Datas sem ciclo recebem `rotulo_padrao`.
+        """
+        codigos = self.codigos(datas) + 1
+        categorias = [rotulo_padrao] + self.rotulos
+        return pd.Categorical.from_codes(codigos, categories=categorias, ordered=True)
+
+
+def atribuir_mes_fatura(datas, dia_fechamento=DIA_FECHAMENTO):
+    """Atalho para as ETLs: monta o calendário que cobre `datas` e rotula cada linha."""
+    return CalendarioFatura.para_datas(datas, dia_fechamento).atribuir(datas)
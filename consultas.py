@@ -0,0 +1,399 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from cache_dados import derivado
+from esquema import COLUNA_CENTAVOS, COLUNA_VALOR
+from indice_linhas import COLUNAS_INDICE, IndiceLinhas
+from intencoes import dobrar_acentos
+
+# =================================================================
+# PLANOS DE CONSULTA DO AGENTE LOCAL
+# =================================================================
+# A pergunta vira um plano (PlanoConsulta): operação (soma, média, maior,
+# contagem), entidades citadas (entidades.py), período em meses e
+# agrupamento opcional. O plano roda sobre colunas pré-indexadas uma vez
+# por versão da base (MotorConsultas, via cache_dados.derivado): centavos,
+# valores, mês de cada linha pela Data e pelo ciclo MES_FATURA, e códigos
+# inteiros das colunas de agrupamento, e as posições das linhas por fatura,
+# categoria e estabelecimento (indice_linhas.py). Com estabelecimento citado,
+# a consulta parte só das linhas dele; os demais filtros comparam inteiros
+# nessas posições e agregar é bincount por código, sem varrer o DataFrame nem
+# comparar texto por linha (o texto das entidades é comparado só com os
+# valores distintos da coluna).
+#   "quanto gastei com ifood entre março e junho por semana"
+#   -> soma, Descrição ~ ifood, Data de 03 a 06, agrupado por SEMANA_FATURA
+# Período: nomes de mês por extenso, com ou sem ano ("março de 2024");
+# "entre/de X e/a Y", "desde X", "até X" ou um mês só. Se a pergunta fala em
+# "fatura", o período é sobre MES_FATURA; senão, sobre a Data da compra. Sem
+# ano, vale o mais recente até o último mês com dados na coluna do período
+# (as compras podem terminar antes do último ciclo de fatura).
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+}
+
+# Palavra depois de "por" -> coluna do agrupamento
+AGRUPAMENTOS = {
+    'semana': 'SEMANA_FATURA',
+    'mes': 'MES_FATURA',
+    'meses': 'MES_FATURA',
+    'fatura': 'MES_FATURA',
+    'categoria': 'Categoria',
+    'estabelecimento': 'Descrição',
+    'loja': 'Descrição',
+}
+ROTULOS_AGRUPAMENTO = {
+    'SEMANA_FATURA': 'semana da fatura',
+    'MES_FATURA': 'fatura',
+    'Categoria': 'categoria',
+    'Descrição': 'estabelecimento',
+}
+# Agrupamentos no tempo saem na ordem do rótulo; os demais, do maior valor para o menor
+AGRUPAMENTOS_TEMPORAIS = {'SEMANA_FATURA', 'MES_FATURA'}
+_VAZIO = np.array([], dtype=np.intp)
+
+
+def _ordinal(ano, mes):
+    return ano * 12 + mes - 1
+
+
+def _rotulo_mes(ordinal):
+    return f"{ordinal // 12}-{ordinal % 12 + 1:02d}"
+
+
+class PlanoConsulta:
+    """Operação, entidades [(coluna, valor)], período (mês inicial, mês final, coluna) e agrupamento."""
+
+    def __init__(self, operacao=None, entidades=(), periodo=None, agrupar_por=None):
+        self.operacao = operacao
+        self.entidades = tuple(entidades)
+        self.periodo = periodo
+        self.agrupar_por = agrupar_por
+
+    def chave(self):
+        """Tupla hashable do plano (para cache)."""
+        return (self.operacao, self.entidades, self.periodo, self.agrupar_por)
+
+    def __repr__(self):
+        return (f"PlanoConsulta(operacao={self.operacao!r}, entidades={list(self.entidades)!r}, "
+                f"periodo={self.periodo!r}, agrupar_por={self.agrupar_por!r})")
+
+
+def _operacao(pergunta):
+    if any(p in pergunta for p in ["total", "soma", "quanto gastei"]):
+        return "soma"
+    elif "média" in pergunta or "media" in pergunta:
+        return "media"
+    elif "maior" in pergunta:
+        return "max"
+    elif any(p in pergunta for p in ["quantas", "quantidade", "contagem"]):
+        return "contagem"
+    return None
+
+
+def _agrupamento(palavras):
+    for anterior, palavra in zip(palavras, palavras[1:]):
+        if anterior == 'por':
+            coluna = AGRUPAMENTOS.get(palavra) or AGRUPAMENTOS.get(palavra[:-1] if palavra.endswith('s') else None)
+            if coluna:
+                return coluna
+    return None
+
+
+def _periodo(palavras, ultimo_mes):
+    """
+    (mês inicial, mês final) em ordinais ano*12+mês-1, ou None sem mês citado.
+    `ultimo_mes` é o último mês com dados na coluna filtrada.
+    """
+    citados = []  # (posição, mês, ano ou None)
+    for i, palavra in enumerate(palavras):
+        mes = MESES.get(palavra)
+        if mes is None:
+            continue
+        seguintes = palavras[i + 1:i + 3]
+        if seguintes and seguintes[0] == 'de':
+            seguintes = seguintes[1:]
+        ano = int(seguintes[0]) if seguintes and re.fullmatch(r'\d{4}', seguintes[0]) else None
+        citados.append((i, mes, ano))
+    if not citados or ultimo_mes is None:
+        return None
+
+    ano_ref, mes_ref = divmod(ultimo_mes, 12)
+    mes_ref += 1
+
+    def ano_ate(mes, ano, limite_ano, limite_mes):
+        # Sem ano: o mais recente com (ano, mês) <= limite
+        if ano is not None:
+            return ano
+        return limite_ano if mes <= limite_mes else limite_ano - 1
+
+    (pos_ini, mes_ini, ano_ini), (_, mes_fim, ano_fim) = citados[0], citados[-1]
+    if len(citados) == 1:
+        anteriores = palavras[max(pos_ini - 2, 0):pos_ini]
+        anterior = anteriores[-1] if anteriores else ''
+        if anterior == 'de' and len(anteriores) == 2:
+            anterior = anteriores[0]  # "a partir de março"
+        ano = ano_ate(mes_ini, ano_ini, ano_ref, mes_ref)
+        if anterior in ('desde', 'partir'):
+            return _ordinal(ano, mes_ini), ultimo_mes
+        if anterior == 'ate':
+            return None, _ordinal(ano, mes_ini)
+        return _ordinal(ano, mes_ini), _ordinal(ano, mes_ini)
+
+    # Ano citado num dos extremos vale para o outro ("entre março e junho de 2024")
+    if ano_fim is None and ano_ini is not None:
+        ano_fim = ano_ini if mes_fim >= mes_ini else ano_ini + 1
+    ano_fim = ano_ate(mes_fim, ano_fim, ano_ref, mes_ref)
+    ano_ini = ano_ate(mes_ini, ano_ini, ano_fim, mes_fim)
+    inicio, fim = _ordinal(ano_ini, mes_ini), _ordinal(ano_fim, mes_fim)
+    return (inicio, fim) if inicio <= fim else (fim, inicio)
+
+
+def planejar(pergunta, entidades, ultimos_meses=None):
+    """
+    Plano da pergunta. `entidades` é um IndiceEntidades; `ultimos_meses`
+    ({'Data': ordinal, 'MES_FATURA': ordinal}, ver MotorConsultas) resolve
+    meses sem ano pela coluna do período. Categoria só vale se a pergunta
+    falar em "categoria".
+    """
+    pergunta = pergunta.lower()
+    palavras = re.findall(r'\w+', dobrar_acentos(pergunta))
+
+    citadas = entidades.encontrar(pergunta)
+    if "categoria" not in pergunta:
+        citadas = [(coluna, valor) for coluna, valor in citadas if coluna != "Categoria"]
+
+    operacao = _operacao(pergunta)
+    agrupar_por = _agrupamento(palavras)
+    coluna_periodo = 'MES_FATURA' if any(p.startswith('fatura') for p in palavras) else 'Data'
+    meses = _periodo(palavras, (ultimos_meses or {}).get(coluna_periodo))
+    periodo = None if meses is None else (*meses, coluna_periodo)
+
+    # Agrupamento ou período sem operação explícita: total
+    if operacao is None and (agrupar_por or periodo):
+        operacao = "soma"
+    return PlanoConsulta(operacao, citadas, periodo, agrupar_por)
+
+
+def _codificar(serie):
+    """Códigos inteiros por linha (-1 = vazio) e rótulos na ordem dos códigos."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy().astype(np.int32), np.asarray(serie.cat.categories, dtype=object)
+    codigos, rotulos = pd.factorize(serie, sort=True)
+    return codigos.astype(np.int32), np.asarray(rotulos, dtype=object)
+
+
+def _meses_fatura(rotulos):
+    """Ordinal do mês de cada rótulo MES_FATURA ('2024-03 (MAR)'); -1 se não for ciclo."""
+    ordinais = np.full(len(rotulos) + 1, -1, dtype=np.int32)  # última posição: código -1
+    for i, rotulo in enumerate(rotulos):
+        achado = re.match(r'(\d{4})-(\d{2})', str(rotulo))
+        if achado:
+            ordinais[i] = _ordinal(int(achado.group(1)), int(achado.group(2)))
+    return ordinais
+
+
+class MotorConsultas:
+    """Colunas da base pré-indexadas para executar PlanoConsulta por posições."""
+
+    def __init__(self, base):
+        self.indice = IndiceLinhas(base, COLUNAS_INDICE + ['Descrição'])
+        self.centavos = base[COLUNA_CENTAVOS].to_numpy()
+        self.valores = base[COLUNA_VALOR].to_numpy()
+
+        self.meses = {}
+        if 'Data' in base.columns:
+            datas = base['Data']
+            self.meses['Data'] = (datas.dt.year * 12 + datas.dt.month - 1).fillna(-1).to_numpy().astype(np.int32)
+        if 'MES_FATURA' in base.columns:
+            codigos, rotulos = _codificar(base['MES_FATURA'])
+            self.meses['MES_FATURA'] = _meses_fatura(rotulos)[codigos]
+        # Último mês com dados em cada coluna de período (referência dos meses sem ano)
+        self.ultimos_meses = {coluna: int(meses.max()) for coluna, meses in self.meses.items()
+                              if len(meses) and meses.max() >= 0}
+
+        self.codigos = {}
+        self.rotulos = {}
+        for coluna in set(AGRUPAMENTOS.values()) | {'Descrição', 'Categoria'}:
+            if coluna in base.columns:
+                self.codigos[coluna], self.rotulos[coluna] = _codificar(base[coluna])
+        self._rotulos_minusculos = {coluna: pd.Index(rotulos).astype(str).str.lower()
+                                    for coluna, rotulos in self.rotulos.items()}
+        self._codigos_entidade = {}
+
+    def __repr__(self):
+        return f"MotorConsultas({len(self.valores)} linhas; colunas {sorted(self.codigos)})"
+
+    def _codigos_que_contem(self, coluna, valor):
+        """Códigos da coluna cujo rótulo contém `valor` (sem diferenciar maiúsculas)."""
+        chave = (coluna, valor)
+        if chave not in self._codigos_entidade:
+            contem = self._rotulos_minusculos[coluna].str.contains(str(valor).lower(), regex=False)
+            self._codigos_entidade[chave] = np.flatnonzero(contem)
+        return self._codigos_entidade[chave]
+
+    def _linhas_dos_estabelecimentos(self, codigos, arquivo, categoria):
+        """Posições dos gastos positivos dos códigos de Descrição, com o filtro da fatura/categoria."""
+        rotulos = self.rotulos['Descrição']
+        grupos = self.indice.grupos['Descrição']
+        partes = [grupos.get(rotulos[codigo], _VAZIO) for codigo in codigos]
+        posicoes = np.sort(np.concatenate(partes)) if partes else _VAZIO
+        posicoes = posicoes[self.indice.positivo[posicoes]]
+        for coluna, valor in (('Arquivo', arquivo), ('Categoria', categoria)):
+            if valor is not None and coluna in self.indice.codigos:
+                codigo = self.indice.codigo_de[coluna].get(valor, -2)
+                posicoes = posicoes[self.indice.codigos[coluna][posicoes] == codigo]
+        return posicoes
+
+    def filtrar(self, plano, arquivo=None, categoria=None):
+        """
+        Posições dos gastos positivos da fatura/categoria (None = todas) que
+        atendem às entidades e ao período do plano.
+        """
+        # Entidades da mesma coluna somam (OU); colunas diferentes restringem (E)
+        por_coluna = {}
+        for coluna, valor in plano.entidades:
+            if coluna in self.codigos:
+                por_coluna.setdefault(coluna, []).append(self._codigos_que_contem(coluna, valor))
+        por_coluna = {coluna: np.unique(np.concatenate(alvos)) for coluna, alvos in por_coluna.items()}
+
+        # Estabelecimento citado: parte só das linhas dele
+        if 'Descrição' in por_coluna:
+            posicoes = self._linhas_dos_estabelecimentos(por_coluna.pop('Descrição'), arquivo, categoria)
+        else:
+            posicoes = self.indice.posicoes(arquivo, categoria, positivos=True)
+
+        for coluna, alvos in por_coluna.items():
+            # Tabela código -> aceito (posição extra para o código -1)
+            aceitos = np.zeros(len(self.rotulos[coluna]) + 1, dtype=bool)
+            aceitos[alvos] = True
+            posicoes = posicoes[aceitos[self.codigos[coluna][posicoes]]]
+
+        if plano.periodo is not None:
+            inicio, fim, coluna = plano.periodo
+            meses = self.meses.get(coluna)
+            if meses is not None:
+                mes = meses[posicoes]
+                dentro = mes >= 0
+                if inicio is not None:
+                    dentro &= mes >= inicio
+                if fim is not None:
+                    dentro &= mes <= fim
+                posicoes = posicoes[dentro]
+        return posicoes
+
+    def agregar(self, posicoes, agrupar_por=None):
+        """Valor (R$), Qtd, Ticket_Medio e Maior das posições, por grupo ou numa linha só."""
+        if agrupar_por is None or agrupar_por not in self.codigos:
+            qtd = len(posicoes)
+            total = int(self.centavos[posicoes].sum()) / 100
+            return pd.DataFrame([{
+                COLUNA_VALOR: total,
+                'Qtd': qtd,
+                'Ticket_Medio': total / qtd if qtd else np.nan,
+                'Maior': self.valores[posicoes].max() if qtd else np.nan,
+            }])
+
+        codigos = self.codigos[agrupar_por][posicoes]
+        validos = codigos >= 0
+        codigos, posicoes = codigos[validos], posicoes[validos]
+        n = len(self.rotulos[agrupar_por])
+        soma = np.bincount(codigos, weights=self.centavos[posicoes], minlength=n).astype(np.int64)
+        qtd = np.bincount(codigos, minlength=n)
+        maior = np.full(n, -np.inf)
+        np.maximum.at(maior, codigos, self.valores[posicoes])
+
+        presentes = np.flatnonzero(qtd)
+        tabela = pd.DataFrame({
+            agrupar_por: self.rotulos[agrupar_por][presentes],
+            COLUNA_VALOR: soma[presentes] / 100,
+            'Qtd': qtd[presentes],
+        })
+        tabela['Ticket_Medio'] = tabela[COLUNA_VALOR] / tabela['Qtd']
+        tabela['Maior'] = maior[presentes]
+        if agrupar_por not in AGRUPAMENTOS_TEMPORAIS:
+            tabela = tabela.sort_values(COLUNA_VALOR, ascending=False, kind='stable')
+        return tabela.reset_index(drop=True)
+
+    def executar(self, plano, arquivo=None, categoria=None):
+        """(texto da resposta, tabela) do plano sobre os gastos positivos da fatura/categoria."""
+        if plano.operacao is None:
+            return "Não consegui entender sua pergunta. Tente reformular.", None
+        posicoes = self.filtrar(plano, arquivo, categoria)
+        resumo = self.agregar(posicoes)
+        # Sem agrupamento (ou coluna ausente na base): só o resumo
+        if plano.agrupar_por not in self.codigos:
+            return responder(plano, resumo.iloc[0]), resumo
+        tabela = self.agregar(posicoes, plano.agrupar_por)
+        return responder(plano, resumo.iloc[0], tabela), tabela
+
+
+# Operação -> (coluna da tabela, frase)
+_FRASES = {
+    'soma': (COLUNA_VALOR, "O total gasto{periodo} foi de R$ {valor:,.2f}."),
+    'media': ('Ticket_Medio', "A média dos gastos{periodo} é R$ {valor:,.2f}."),
+    'max': ('Maior', "A maior compra{periodo} foi de R$ {valor:,.2f}."),
+    'contagem': ('Qtd', "Foram encontradas {valor:.0f} transações{periodo}."),
+}
+
+
+def _descrever_periodo(periodo):
+    if periodo is None:
+        return ""
+    inicio, fim, coluna = periodo
+    sufixo = " (faturas)" if coluna == 'MES_FATURA' else ""
+    if inicio is None:
+        return f" até {_rotulo_mes(fim)}{sufixo}"
+    if inicio == fim:
+        return f" em {_rotulo_mes(inicio)}{sufixo}"
+    return f" de {_rotulo_mes(inicio)} a {_rotulo_mes(fim)}{sufixo}"
+
+
+def responder(plano, resumo, tabela=None):
+    """Texto da resposta a partir do resumo (uma linha) e da tabela agrupada, se houver."""
+    coluna, frase = _FRASES[plano.operacao]
+    if resumo['Qtd'] == 0 and plano.operacao in ('media', 'max'):
+        return f"Nenhuma transação encontrada{_descrever_periodo(plano.periodo)}."
+    texto = frase.format(periodo=_descrever_periodo(plano.periodo), valor=resumo[coluna])
+    if tabela is not None and len(tabela):
+        destaque = tabela.loc[tabela[coluna].idxmax()]
+        valor = f"{destaque[coluna]:.0f} transações" if coluna == 'Qtd' else f"R$ {destaque[coluna]:,.2f}"
+        texto += (f" Por {ROTULOS_AGRUPAMENTO[plano.agrupar_por]} ({len(tabela)}): "
+                  f"maior em {destaque[plano.agrupar_por]} ({valor}).")
+    return texto
+
+
+def motor_consultas(colunas=None):
+    """Motor de consultas da base em cache, remontado só quando a base muda."""
+    return derivado('motor_consultas', MotorConsultas, colunas)
+
+
+# ----------------- VERIFICAÇÃO RÁPIDA -----------------
+# Compras até 2025-12 e ciclos de fatura até 2026-01: "janeiro" sem ano vale
+# 2025-01 pela Data e 2026-01 pela fatura.
+if __name__ == '__main__':
+    from esquema import aplicar_esquema
+    from entidades import IndiceEntidades
+
+    base = aplicar_esquema(pd.DataFrame({
+        'Data': ['2025-01-10', '2025-06-15', '2025-12-20'],
+        'MES_FATURA': ['2025-02 (FEV)', '2025-07 (JUL)', '2026-01 (JAN)'],
+        'SEMANA_FATURA': [1, 2, 3],
+        'Arquivo': ['fatura-fev.pdf', 'fatura-jul.pdf', 'fatura-jan.pdf'],
+        'Descrição': ['IFOOD', 'UBER', 'IFOOD'],
+        'Categoria': ['Alimentação', 'Transporte', 'Alimentação'],
+        'Valor (R$)': [10.0, 20.0, 30.0],
+    }))
+    motor = MotorConsultas(base)
+    entidades = IndiceEntidades(base)
+
+    plano = planejar("quanto gastei em janeiro", entidades, motor.ultimos_meses)
+    assert plano.periodo == (_ordinal(2025, 1), _ordinal(2025, 1), 'Data'), plano
+    texto, _ = motor.executar(plano)
+    assert 'R$ 10.00' in texto, texto
+    plano = planejar("quanto gastei na fatura de janeiro", entidades, motor.ultimos_meses)
+    assert plano.periodo == (_ordinal(2026, 1), _ordinal(2026, 1), 'MES_FATURA'), plano
+    print("ok:", texto)
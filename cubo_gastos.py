@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from cache_dados import derivado
+from esquema import COLUNA_CENTAVOS, COLUNA_VALOR
+
+# =================================================================
+# CUBO DE AGREGADOS DOS GASTOS POSITIVOS
+# =================================================================
+# Os gastos positivos são pré-agregados uma vez por versão da base no grão
+#   (Arquivo, Categoria, Descrição, Dia_Semana, SEMANA_FATURA)
+# com soma (centavos), quantidade, maior valor e soma dos quadrados. KPIs,
+# pareto, evolução por fatura e dia da semana saem daqui por roll-up: o
+# custo depende do número de grupos, não do número de transações.
+# Colunas do grão ausentes na base (ex.: Categoria) são simplesmente ignoradas.
+
+GRAO = ['Arquivo', 'Categoria', 'Descrição', 'Dia_Semana', 'SEMANA_FATURA']
+MEDIDAS = ['soma_centavos', 'qtd', 'maior', 'soma_quadrados']
+
+
+def montar_cubo(df):
+    """Agrega os gastos positivos de `df` no GRAO (só as colunas presentes)."""
+    grao = [c for c in GRAO if c in df.columns]
+    positivos = df.loc[df[COLUNA_VALOR] > 0, grao + [COLUNA_CENTAVOS, COLUNA_VALOR]]
+    positivos = positivos.assign(quadrado=positivos[COLUNA_VALOR] ** 2)
+
+    cubo = positivos.groupby(grao, observed=True, dropna=False).agg(
+        soma_centavos=(COLUNA_CENTAVOS, 'sum'),
+        qtd=(COLUNA_CENTAVOS, 'size'),
+        maior=(COLUNA_VALOR, 'max'),
+        soma_quadrados=('quadrado', 'sum'),
+    )
+    return cubo.reset_index()
+
+
+def cubo_base(colunas=None):
+    """Cubo da base em cache (cache_dados), reconstruído só quando a base muda."""
+    return derivado('cubo_gastos', montar_cubo, colunas)
+
+
+def filtrar(cubo, arquivo=None, categoria=None):
+    """Fatias do cubo por fatura e/ou categoria (None = todas)."""
+    mascara = np.ones(len(cubo), dtype=bool)
+    if arquivo is not None:
+        mascara &= (cubo['Arquivo'] == arquivo).to_numpy()
+    if categoria is not None and 'Categoria' in cubo.columns:
+        mascara &= (cubo['Categoria'] == categoria).to_numpy()
+    return cubo[mascara]
+
+
+def kpis(cubo):
+    """
+    Total (soma exata dos centavos, em reais), quantidade, ticket médio,
+    maior compra, média e desvio padrão amostral dos gastos do cubo.
+    """
+    qtd = int(cubo['qtd'].sum())
+    total = int(cubo['soma_centavos'].sum()) / 100
+    if qtd == 0:
+        return {'total': 0.0, 'qtd': 0, 'ticket_medio': 0, 'maior': 0, 'media': np.nan, 'desvio': np.nan}
+
+    media = total / qtd
+    # Variância amostral a partir de soma e soma dos quadrados
+    variancia = (cubo['soma_quadrados'].sum() - qtd * media ** 2) / (qtd - 1) if qtd > 1 else np.nan
+    return {
+        'total': total,
+        'qtd': qtd,
+        'ticket_medio': media,
+        'maior': float(cubo['maior'].max()),
+        'media': media,
+        'desvio': float(np.sqrt(max(variancia, 0))) if qtd > 1 else np.nan,
+    }
+
+
+def por(cubo, coluna):
+    """
+    Roll-up do cubo por `coluna`: 'Valor (R$)' (soma), 'Qtd', 'Maior' e
+    'Ticket_Medio', na ordem das categorias da coluna.
+    """
+    agrupado = cubo.groupby(coluna, observed=True).agg(
+        soma_centavos=('soma_centavos', 'sum'),
+        Qtd=('qtd', 'sum'),
+        Maior=('maior', 'max'),
+    )
+    agrupado.insert(0, COLUNA_VALOR, agrupado.pop('soma_centavos') / 100)
+    agrupado['Ticket_Medio'] = agrupado[COLUNA_VALOR] / agrupado['Qtd']
+    return agrupado
+
+
+def pareto(cubo):
+    """Mesma tabela de analises.pareto, calculada a partir do cubo."""
+    total = int(cubo['soma_centavos'].sum()) / 100
+    tabela = por(cubo, 'Descrição')[COLUNA_VALOR].sort_values(ascending=False).reset_index()
+    tabela['%'] = tabela[COLUNA_VALOR] / total * 100
+    tabela['%_acumulado'] = tabela['%'].cumsum()
+    return tabela
@@ -4,6 +4,20 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+import analises
+import cubo_gastos
+from cache_dados import carregar_base, derivado_por_chave
+from cache_respostas import resposta_em_cache
+from indice_linhas import indice_base
+from pareto_gastos import pareto_filtro
+from periodos_fatura import periodos_base
+from tabela_paginada import exibir_tabela, ordem_base
+from intencoes import detectar_intencao
+from respostas_intencoes import IndicadoresFiltro, executar_intencao
+
+# Colunas usadas pelo dashboard (as demais nem são lidas do disco)
+COLUNAS_DASHBOARD = ['MES_FATURA', 'SEMANA_FATURA', 'Data', 'Arquivo', 'Descrição', 'Valor (R$)', 'Categoria']
+
 # ========================================
 # CONFIGURAÇÃO DA PÁGINA
 # ========================================
@@ -18,32 +32,15 @@ st.set_page_config(
 # CARREGAR DADOS
 # ========================================
 
-@st.cache_data
-def carregar_dados():
-    df = pd.read_csv("gastos_consolidados_final.csv")
-
-
-     # 🔥 CONVERSÃO DA COLUNA VALOR
-    if 'Valor (R$)' in df.columns:
-        df['Valor (R$)'] = (
-            df['Valor (R$)']
-            .astype(str)
-            .str.replace('R$', '', regex=False)
-            .str.replace('.', '', regex=False)
-            .str.replace(',', '.', regex=False)
-            .str.strip()
-        )
-
-        df['Valor (R$)'] = pd.to_numeric(df['Valor (R$)'], errors='coerce')
+# Base compartilhada com os outros dashboards (cache_dados.py), já com
+# Mes/Dia_Semana; recarregada sozinha quando a ETL regrava a fonte
+df = carregar_base(COLUNAS_DASHBOARD)
 
-    if 'Data' in df.columns:
-        df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-        df['Mes'] = df['Data'].dt.to_period('M').astype(str)
-        df['Dia_Semana'] = df['Data'].dt.day_name()
+# Posições das linhas por fatura/categoria/valor positivo (indice_linhas.py)
+indice = indice_base(COLUNAS_DASHBOARD)
 
-    return df
-
-df = carregar_dados()
+# Uma linha por fatura na ordem do ciclo MES_FATURA (periodos_fatura.py)
+periodos = periodos_base(COLUNAS_DASHBOARD)
 
 st.title("💳 Dashboard Inteligente de Gastos")
 
@@ -55,7 +52,7 @@ col1, col2 = st.columns(2)
 
 with col1:
 
-    opcoes = ["Resumo Total"] + sorted(df['Arquivo'].dropna().unique().tolist())
+    opcoes = ["Resumo Total"] + periodos.ordem
 
     fatura_selecionada = st.selectbox(
         "📅 Selecione a fatura:",
@@ -80,16 +77,15 @@ with col2:
 # FILTRAGEM
 # ========================================
 
-if fatura_selecionada == "Resumo Total":
-    df_filtrado = df.copy()
-else:
-    df_filtrado = df[df['Arquivo'] == fatura_selecionada]
-
-if categoria_selecionada != "Todas" and 'Categoria' in df.columns:
-    df_filtrado = df_filtrado[df_filtrado['Categoria'] == categoria_selecionada]
+# Fatias pelo índice de posições (indice_linhas.py): só as linhas da seleção são tocadas
+filtro = {
+    'arquivo': None if fatura_selecionada == "Resumo Total" else fatura_selecionada,
+    'categoria': None if categoria_selecionada == "Todas" else categoria_selecionada,
+}
+df_filtrado = indice.selecionar(df, **filtro)
 
 # somente gastos positivos
-gastos_positivos = df_filtrado[df_filtrado['Valor (R$)'] > 0]
+gastos_positivos = indice.selecionar(df, positivos=True, **filtro)
 
 # ========================================
 # KPIs
@@ -97,32 +93,28 @@ gastos_positivos = df_filtrado[df_filtrado['Valor (R$)'] > 0]
 
 st.subheader("📊 Visão Geral")
 
-total_gasto = gastos_positivos['Valor (R$)'].sum()
-
-qtd_transacoes = len(gastos_positivos)
+# KPIs, pareto e evolução saem do cubo de agregados (cubo_gastos.py), não das linhas
+cubo = cubo_gastos.cubo_base(COLUNAS_DASHBOARD)
 
-ticket_medio = total_gasto / qtd_transacoes if qtd_transacoes > 0 else 0
+cubo_filtrado = cubo_gastos.filtrar(cubo, **filtro)
 
-maior_compra = gastos_positivos['Valor (R$)'].max() if qtd_transacoes > 0 else 0
+indicadores = cubo_gastos.kpis(cubo_filtrado)
 
-# comparação mês anterior
+total_gasto = indicadores['total']  # soma exata em centavos
 
-variacao = 0
+qtd_transacoes = indicadores['qtd']
 
-if fatura_selecionada != "Resumo Total":
+ticket_medio = indicadores['ticket_medio']
 
-    idx = opcoes.index(fatura_selecionada)
+maior_compra = indicadores['maior']
 
-    if idx > 1:
+# comparação com a fatura anterior no ciclo
 
-        anterior = opcoes[idx-1]
-
-        df_anterior = df[df['Arquivo'] == anterior]
+variacao = 0
 
-        total_anterior = df_anterior[df_anterior['Valor (R$)'] > 0]['Valor (R$)'].sum()
+if fatura_selecionada != "Resumo Total":
 
-        if total_anterior > 0:
-            variacao = ((total_gasto - total_anterior) / total_anterior) * 100
+    variacao = periodos.variacao(fatura_selecionada, filtro['categoria'])
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -142,11 +134,18 @@ st.divider()
 
 st.subheader("🎯 Concentração de Gastos")
 
-pareto = gastos_positivos.groupby('Descrição')['Valor (R$)'].sum().sort_values(ascending=False).reset_index()
-
-pareto['%'] = pareto['Valor (R$)'] / total_gasto * 100
-
-pareto['%_acumulado'] = pareto['%'].cumsum()
+# Totais por estabelecimento em cache por filtro; só os k maiores são ordenados
+pareto = pareto_filtro(COLUNAS_DASHBOARD, **filtro)
+top10 = pareto.top(10)
+
+# Variação, previsão, score e risco do filtro, com as mesmas regras do
+# assistente e do perguntas_lote.py (respostas_intencoes.py), em cache por filtro
+indicadores_filtro = derivado_por_chave(
+    'indicadores_filtro',
+    (filtro['arquivo'], filtro['categoria']),
+    lambda: IndicadoresFiltro(cubo, periodos, gastos_positivos['Valor (R$)'].to_numpy(), pareto, **filtro),
+    COLUNAS_DASHBOARD
+)
 
 col1, col2 = st.columns(2)
 
@@ -155,14 +154,14 @@ with col1:
     fig = go.Figure()
 
     fig.add_trace(go.Bar(
-        x=pareto['Descrição'][:10],
-        y=pareto['Valor (R$)'][:10],
+        x=top10['Descrição'],
+        y=top10['Valor (R$)'],
         name="Gasto"
     ))
 
     fig.add_trace(go.Scatter(
-        x=pareto['Descrição'][:10],
-        y=pareto['%_acumulado'][:10],
+        x=top10['Descrição'],
+        y=top10['%_acumulado'],
         yaxis="y2",
         name="% acumulado"
     ))
@@ -175,11 +174,11 @@ with col1:
 
 with col2:
 
-    top1 = pareto.iloc[0]
+    top1 = pareto.maior()
 
-    top3 = pareto.head(3)['%'].sum()
+    top3 = pareto.participacao(3)
 
-    top5 = pareto.head(5)['%'].sum()
+    top5 = pareto.participacao(5)
 
     st.metric("Maior fonte", top1['Descrição'], f"{top1['%']:.1f}%")
 
@@ -195,7 +194,7 @@ st.divider()
 
 st.subheader("📈 Evolução")
 
-evolucao = df[df['Valor (R$)'] > 0].groupby('Arquivo')['Valor (R$)'].sum().reset_index()
+evolucao = periodos.tabela[['Arquivo', 'Valor (R$)']]
 
 fig = px.line(
     evolucao,
@@ -212,11 +211,7 @@ st.plotly_chart(fig, use_container_width=True)
 
 st.subheader("🔮 Previsão")
 
-media = evolucao['Valor (R$)'].mean()
-
-tendencia = evolucao['Valor (R$)'].diff().mean()
-
-previsao = media + tendencia
+previsao = indicadores_filtro.previsao
 
 col1, col2 = st.columns(2)
 
@@ -226,36 +221,14 @@ col2.metric("Projeção anual", f"R$ {previsao*12:,.2f}")
 
 st.divider()
 
-# ========================================
-# OUTLIERS
-# ========================================
-
-media_valor = gastos_positivos['Valor (R$)'].mean()
-
-desvio = gastos_positivos['Valor (R$)'].std()
-
-outliers = gastos_positivos[gastos_positivos['Valor (R$)'] > media_valor + 2*desvio]
-
 # ========================================
 # SCORE FINANCEIRO
 # ========================================
 
 st.subheader("🧠 Score Financeiro")
 
-score = 100
-
-if variacao > 20:
-    score -= 15
-
-if len(outliers) > 0:
-    score -= 15
-
-concentracao = pareto.iloc[0]['%']
-
-if concentracao > 40:
-    score -= 20
-
-score = max(score, 0)
+# Perde pontos com alta contra a fatura anterior, outliers e concentração
+score = indicadores_filtro.score
 
 fig = go.Figure(go.Indicator(
     mode="gauge+number",
@@ -271,9 +244,9 @@ st.plotly_chart(fig, use_container_width=True)
 
 st.subheader("⚠️ Risco")
 
-if concentracao > 50:
+if indicadores_filtro.risco == "alto":
     st.error("Risco Alto")
-elif concentracao > 30:
+elif indicadores_filtro.risco == "moderado":
     st.warning("Risco Moderado")
 else:
     st.success("Risco Baixo")
@@ -286,11 +259,12 @@ st.divider()
 
 st.subheader("🔍 Transações")
 
-st.dataframe(
-    gastos_positivos.sort_values(
-        'Valor (R$)',
-        ascending=False
-    )
+# Só as colunas da base; as internas (centavos, Mes, Dia_Semana) não aparecem
+exibir_tabela(
+    gastos_positivos,
+    COLUNAS_DASHBOARD,
+    "transacoes",
+    ordem_base(COLUNAS_DASHBOARD)
 )
 
 # ========================================
@@ -301,155 +275,6 @@ st.subheader("🤖 Assistente Financeiro Inteligente")
 
 pergunta = st.text_input("Pergunte qualquer coisa sobre seus gastos:")
 
-# ========================================
-# INTENÇÕES SUPORTADAS
-# ========================================
-
-def detectar_intencao(texto):
-
-    texto = texto.lower()
-
-    intents = {
-
-        "maior_gasto": [
-            "onde gasto mais",
-            "maior gasto",
-            "gasto mais",
-            "quem recebe mais dinheiro"
-        ],
-
-        "total": [
-            "total",
-            "quanto gastei",
-            "valor total",
-            "gasto total"
-        ],
-
-        "media": [
-            "media",
-            "médio",
-            "ticket medio"
-        ],
-
-        "contagem": [
-            "quantas compras",
-            "quantas transações",
-            "quantidade"
-        ],
-
-        "score": [
-            "score",
-            "nota financeira"
-        ],
-
-        "risco": [
-            "risco",
-            "perigo financeiro"
-        ],
-
-        "economizar": [
-            "economizar",
-            "como economizar",
-            "reduzir gastos"
-        ],
-
-        "previsao": [
-            "previsão",
-            "projeção",
-            "quanto vou gastar"
-        ],
-
-        "categoria": [
-            "categoria",
-            "qual categoria gasto mais"
-        ]
-    }
-
-    for intent, palavras in intents.items():
-
-        for palavra in palavras:
-
-            if palavra in texto:
-                return intent
-
-    return "desconhecido"
-
-
-# ========================================
-# EXECUTOR
-# ========================================
-
-def executar_intencao(intent):
-
-    if intent == "maior_gasto":
-
-        top = pareto.iloc[0]
-
-        return f"Você gasta mais em {top['Descrição']}, totalizando R$ {top['Valor (R$)']:,.2f}"
-
-    elif intent == "total":
-
-        return f"Seu gasto total foi R$ {total_gasto:,.2f}"
-
-    elif intent == "media":
-
-        return f"Seu gasto médio por compra é R$ {ticket_medio:,.2f}"
-
-    elif intent == "contagem":
-
-        return f"Você fez {qtd_transacoes} transações"
-
-    elif intent == "score":
-
-        if score >= 80:
-            nivel = "excelente"
-        elif score >= 60:
-            nivel = "bom"
-        else:
-            nivel = "precisa melhorar"
-
-        return f"Seu score financeiro é {score}/100, considerado {nivel}"
-
-    elif intent == "risco":
-
-        if concentracao > 50:
-            return "Seu risco financeiro é alto devido à alta concentração de gastos"
-
-        elif concentracao > 30:
-            return "Seu risco financeiro é moderado"
-
-        else:
-            return "Seu risco financeiro é baixo"
-
-    elif intent == "economizar":
-
-        top = pareto.iloc[0]
-
-        economia = top['Valor (R$)'] * 0.2
-
-        return f"Se reduzir 20% dos gastos em {top['Descrição']}, economizaria R$ {economia:,.2f}"
-
-    elif intent == "previsao":
-
-        return f"Sua previsão de gasto mensal é R$ {previsao:,.2f}"
-
-    elif intent == "categoria":
-
-        if 'Categoria' in gastos_positivos.columns:
-
-            cat = gastos_positivos.groupby('Categoria')['Valor (R$)'].sum().idxmax()
-
-            valor = gastos_positivos.groupby('Categoria')['Valor (R$)'].sum().max()
-
-            return f"Sua categoria com maior gasto é {cat}, com R$ {valor:,.2f}"
-
-        else:
-            return "Seu dataset não possui categorias"
-
-    else:
-
-        return gerar_resposta_generica()
-
 # ========================================
 # 🎯 ANÁLISE PROFUNDA DE PRIORIDADE FINANCEIRA
 # ========================================
@@ -457,99 +282,11 @@ def executar_intencao(intent):
 st.subheader("🎯 Análise de Prioridade Financeira")
 
 # ============================================
-# 2. FEATURE ENGINEERING
+# 2-7. SCORE, CLASSIFICAÇÃO E ECONOMIA POR ESTABELECIMENTO
+# (impacto mensal, total, frequência e ticket médio; ver analises.py)
 # ============================================
 
-agrupado = df.groupby("Descrição").agg(
-    total=("Valor (R$)", "sum"),
-    frequencia=("Valor (R$)", "count"),
-    media=("Valor (R$)", "mean"),
-    meses_unicos=("mes", "nunique"),
-    maior_compra=("Valor (R$)", "max")
-)
-
-# impacto mensal REAL
-agrupado["impacto_mensal"] = agrupado["total"] / agrupado["meses_unicos"]
-
-# ============================================
-# 3. NORMALIZAÇÃO
-# ============================================
-
-def normalizar(coluna):
-    min_val = coluna.min()
-    max_val = coluna.max()
-    
-    if max_val == min_val:
-        return coluna * 0
-    
-    return (coluna - min_val) / (max_val - min_val)
-
-agrupado["total_norm"] = normalizar(agrupado["total"])
-agrupado["freq_norm"] = normalizar(agrupado["frequencia"])
-agrupado["media_norm"] = normalizar(agrupado["media"])
-agrupado["impacto_norm"] = normalizar(agrupado["impacto_mensal"])
-
-# ============================================
-# 4. SCORE DE PRIORIDADE
-# ============================================
-
-agrupado["score"] = (
-    0.4 * agrupado["impacto_norm"] +
-    0.3 * agrupado["total_norm"] +
-    0.2 * agrupado["freq_norm"] +
-    0.1 * agrupado["media_norm"]
-)
-
-# ============================================
-# 5. CLASSIFICAÇÃO
-# ============================================
-
-def classificar(score):
-
-    if score >= 0.75:
-        return "CRITICO"
-    
-    elif score >= 0.55:
-        return "ALTO"
-    
-    elif score >= 0.35:
-        return "MEDIO"
-    
-    else:
-        return "BAIXO"
-
-agrupado["prioridade"] = agrupado["score"].apply(classificar)
-
-# ============================================
-# 6. ECONOMIA POTENCIAL REALISTA
-# ============================================
-
-def potencial_economia(prioridade):
-
-    if prioridade == "CRITICO":
-        return 0.30
-    
-    elif prioridade == "ALTO":
-        return 0.20
-    
-    elif prioridade == "MEDIO":
-        return 0.10
-    
-    else:
-        return 0.05
-
-agrupado["economia_percentual"] = agrupado["prioridade"].apply(potencial_economia)
-
-agrupado["economia_mensal"] = (
-    agrupado["impacto_mensal"] *
-    agrupado["economia_percentual"]
-)
-
-# ============================================
-# 7. ORDENAR POR PRIORIDADE
-# ============================================
-
-agrupado = agrupado.sort_values("score", ascending=False)
+agrupado = analises.prioridade_gastos(df)
 
 # ============================================
 # 8. RESULTADO FINAL
@@ -601,8 +338,13 @@ for descricao, row in top5.iterrows():
 
 if pergunta:
 
-    intent = detectar_intencao(pergunta)
-
-    resposta = executar_intencao(intent)
+    # Mesma pergunta (normalizada) com o mesmo filtro e a mesma base: resposta do cache
+    resposta = resposta_em_cache(
+        'intencoes',
+        pergunta,
+        (filtro['arquivo'], filtro['categoria']),
+        lambda: executar_intencao(detectar_intencao(pergunta), indicadores_filtro),
+        COLUNAS_DASHBOARD
+    )
 
     st.success(resposta)
\ No newline at end of file
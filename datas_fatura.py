@@ -0,0 +1,102 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# =================================================================
+# NORMALIZAÇÃO DA COLUNA DATA
+# =================================================================
+# As faturas trazem a data como "dd/mm" (sem ano). Um ano de cartão tem no
+# máximo algumas centenas de combinações distintas de (Data, Arquivo), então
+# cada combinação é interpretada uma única vez e o resultado é espalhado de
+# volta para as linhas pelos códigos inteiros do factorize. O memo fica no
+# processo e é reaproveitado entre blocos, faturas e execuções seguidas; é
+# compartilhado pelas threads (ETL paralela, perguntas_lote.py), então só é
+# lido e alterado com a trava.
+
+FORMATO_DATA = '%d/%m/%Y'
+PADRAO_SEM_ANO = r'^\d{1,2}/\d{1,2}$'
+ANO_FATURA_JAN = 2024  # fatura de janeiro traz gastos de dezembro do ano anterior
+ANO_PADRAO = 2025
+LIMITE_MEMO = 200_000
+
+_trava = threading.Lock()
+_memo_etl = {}
+_memo_texto = {}
+
+
+def limpar_memo():
+    with _trava:
+        _memo_etl.clear()
+        _memo_texto.clear()
+
+
+def _completar_ano(datas, arquivos):
+    # Regra: se o arquivo for 'fatura-jan' → concatena 2024, senão concatena 2025
+    sem_ano = datas.str.match(PADRAO_SEM_ANO, na=False)
+    fatura_jan = arquivos.str.contains('fatura-jan', case=False)
+    return datas.where(
+        ~sem_ano,
+        datas + '/' + np.where(fatura_jan, str(ANO_FATURA_JAN), str(ANO_PADRAO))
+    )
+
+
+def _resolver(chaves, memo, interpretar):
+    # Interpreta só as chaves que ainda não estão no memo. O resultado sai de
+    # um dicionário local (conhecidas + novas): esvaziar o memo cheio não
+    # perde as chaves desta chamada
+    with _trava:
+        resolvidas = {c: memo[c] for c in chaves if c in memo}
+    faltando = [c for c in chaves if c not in resolvidas]
+    if faltando:
+        # Interpretadas fora da trava: outras threads não esperam por este bloco
+        novas = dict(zip(faltando, interpretar(faltando)))
+        with _trava:
+            if len(memo) + len(novas) > LIMITE_MEMO:
+                memo.clear()
+            memo.update(novas)
+        resolvidas.update(novas)
+    return pd.DatetimeIndex([resolvidas[c] for c in chaves])
+
+
+def normalizar_datas(datas, arquivos):
+    """
+    Completa o ano das datas "dd/mm" conforme a fatura e converte para
+    datetime UTC, interpretando cada par (Data, Arquivo) distinto uma vez.
+    Retorna uma Series alinhada a `datas`.
+    """
+    datas = pd.Series(datas)
+    arquivos = pd.Series(arquivos, index=datas.index)
+
+    codigos_data, datas_unicas = pd.factorize(datas, use_na_sentinel=False)
+    codigos_arquivo, arquivos_unicos = pd.factorize(arquivos, use_na_sentinel=False)
+    codigos_par, pares = pd.factorize(codigos_data.astype(np.int64) * len(arquivos_unicos) + codigos_arquivo)
+
+    chaves = list(zip(
+        np.asarray(datas_unicas, dtype=object)[pares // len(arquivos_unicos)],
+        np.asarray(arquivos_unicos, dtype=object)[pares % len(arquivos_unicos)],
+    ))
+
+    def interpretar(faltando):
+        texto = pd.Series([c[0] for c in faltando], dtype=object)
+        arquivo = pd.Series([c[1] for c in faltando], dtype=object)
+        texto = _completar_ano(texto, arquivo)
+        return pd.to_datetime(texto, format=FORMATO_DATA, utc=True, errors='coerce')
+
+    valores = _resolver(chaves, _memo_etl, interpretar)
+    return pd.Series(valores.take(codigos_par), index=datas.index, name=datas.name)
+
+
+def converter_datas(datas):
+    """
+    `pd.to_datetime(datas, errors='coerce')` interpretando cada texto distinto
+    uma única vez (usado pelos dashboards ao ler o CSV final).
+    """
+    datas = pd.Series(datas)
+    codigos, unicas = pd.factorize(datas, use_na_sentinel=False)
+    unicas = list(np.asarray(unicas, dtype=object))
+
+    # Formato inferido a partir dos próprios valores distintos (mesma ordem da coluna)
+    valores = _resolver(unicas, _memo_texto,
+                        lambda faltando: pd.to_datetime(pd.Series(faltando, dtype=object), errors='coerce'))
+    return pd.Series(valores.take(codigos), index=datas.index, name=datas.name)
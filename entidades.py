@@ -0,0 +1,80 @@
+import re
+
+import pandas as pd
+
+from cache_dados import derivado
+from intencoes import dobrar_acentos
+
+# =================================================================
+# ENTIDADES CITADAS NAS PERGUNTAS (ESTABELECIMENTOS E CATEGORIAS)
+# =================================================================
+# Os nomes distintos de Descrição e Categoria viram uma trie de palavras
+# (sem acentos, minúsculas, só letras/dígitos: "MP *MELIMAIS" -> mp, melimais),
+# montada uma vez por versão da base (cache_dados.derivado). A pergunta é
+# percorrida palavra a palavra, casando sempre o nome mais longo a partir de
+# cada posição, então o custo depende do tamanho da pergunta (vezes o maior
+# nome em palavras), não do número de estabelecimentos, e uma pergunta pode
+# citar várias entidades. Nomes só casam em palavras inteiras ("tim" não casa
+# com "estimativa").
+
+COLUNAS_ENTIDADES = ('Descrição', 'Categoria')
+_FIM = ''  # chave do nó que fecha um nome (palavras nunca são vazias)
+
+
+def _palavras(texto):
+    return re.findall(r'\w+', dobrar_acentos(texto))
+
+
+class IndiceEntidades:
+    """Trie de palavras dos valores distintos das colunas de entidades."""
+
+    def __init__(self, base, colunas=COLUNAS_ENTIDADES):
+        self._raiz = {}
+        self.tamanho = 0
+        for coluna in colunas:
+            if coluna not in base.columns:
+                continue
+            serie = base[coluna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                valores = serie.cat.categories
+            else:
+                valores = serie.dropna().unique()
+            for valor in valores:
+                palavras = _palavras(valor)
+                if not palavras:
+                    continue
+                no = self._raiz
+                for palavra in palavras:
+                    no = no.setdefault(palavra, {})
+                no.setdefault(_FIM, []).append((coluna, valor))
+                self.tamanho += 1
+
+    def __len__(self):
+        return self.tamanho
+
+    def encontrar(self, texto):
+        """
+        Entidades citadas em `texto`, na ordem: lista de (coluna, valor).
+        Nomes iguais depois de normalizados (ex.: "UBER" e "Uber") voltam todos.
+        """
+        palavras = _palavras(texto)
+        entidades = []
+        i = 0
+        while i < len(palavras):
+            no = self._raiz
+            fim, casados = i + 1, None
+            j = i
+            while j < len(palavras) and palavras[j] in no:
+                no = no[palavras[j]]
+                j += 1
+                if _FIM in no:
+                    fim, casados = j, no[_FIM]
+            if casados:
+                entidades.extend(casados)
+            i = fim
+        return entidades
+
+
+def indice_entidades(colunas=None):
+    """Índice de entidades da base em cache, remontado só quando a base muda."""
+    return derivado('indice_entidades', IndiceEntidades, colunas)
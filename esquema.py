@@ -0,0 +1,106 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from datas_fatura import converter_datas
+
+# =================================================================
+# ESQUEMA DA BASE DE GASTOS
+# =================================================================
+# Tipos fixos usados pela ETL e pelos dashboards:
+# - valores em centavos (int64): somas exatas, sem erro de ponto flutuante
+# - Arquivo / Descrição / MES_FATURA / Categoria como categorias
+# - SEMANA_FATURA em int8
+# A coluna 'Valor (R$)' continua existindo (centavos / 100) para gráficos e
+# formatação, mas totais devem ser feitos sobre COLUNA_CENTAVOS.
+
+COLUNA_DATA = 'Data'
+COLUNA_VALOR = 'Valor (R$)'
+COLUNA_CENTAVOS = 'Valor_centavos'
+COLUNAS_CATEGORICAS = ['Arquivo', 'Descrição', 'MES_FATURA', 'Categoria']
+
+# Leitura de gastos_consolidados.csv pela ETL: texto continua texto, para
+# que a saída CSV seja sempre a mesma independente de blocos/paralelismo
+DTYPES_ENTRADA = {'Arquivo': str, COLUNA_DATA: str, 'Descrição': str, COLUNA_VALOR: 'float64'}
+
+DTYPES = {
+    'Arquivo': 'category',
+    'Descrição': 'category',
+    'MES_FATURA': 'category',
+    'Categoria': 'category',
+    'SEMANA_FATURA': 'int8',
+    COLUNA_CENTAVOS: 'int64',
+}
+
+
+def para_centavos(valores):
+    """Converte reais (float) em centavos int64. Valores ausentes viram 0."""
+    valores = pd.to_numeric(pd.Series(valores), errors='coerce')
+    return pd.Series(np.rint(valores.fillna(0).to_numpy(dtype='float64') * 100).astype('int64'),
+                     index=valores.index, name=COLUNA_CENTAVOS)
+
+
+def em_reais(centavos):
+    """Total exato de uma coluna (ou escalar) em centavos, devolvido em reais."""
+    if isinstance(centavos, (pd.Series, np.ndarray)):
+        centavos = int(centavos.sum())
+    return int(centavos) / 100
+
+
+def aplicar_esquema(df):
+    """
+    Fixa os tipos da base: converte Data para datetime, cria COLUNA_CENTAVOS
+    (a partir de 'Valor (R$)' se preciso), recalcula 'Valor (R$)' a partir
+    dos centavos e converte as colunas de texto repetitivo em categorias. MES_FATURA fica ordenada
+    cronologicamente (os rótulos 'AAAA-MM (MÊS)' já ordenam assim).
+    """
+    df = df.copy()
+
+    if COLUNA_DATA in df.columns and not pd.api.types.is_datetime64_any_dtype(df[COLUNA_DATA]):
+        df[COLUNA_DATA] = converter_datas(df[COLUNA_DATA])
+
+    if COLUNA_CENTAVOS not in df.columns and COLUNA_VALOR in df.columns:
+        df[COLUNA_CENTAVOS] = para_centavos(df[COLUNA_VALOR])
+    if COLUNA_CENTAVOS in df.columns:
+        df[COLUNA_CENTAVOS] = df[COLUNA_CENTAVOS].astype('int64')
+        df[COLUNA_VALOR] = df[COLUNA_CENTAVOS] / 100
+
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype(str).where(df[coluna].notna()).astype('category')
+    if 'MES_FATURA' in df.columns:
+        categorias = sorted(df['MES_FATURA'].cat.categories.astype(str))
+        df['MES_FATURA'] = df['MES_FATURA'].astype(str).astype(
+            pd.CategoricalDtype(categorias, ordered=True)
+        )
+
+    if 'SEMANA_FATURA' in df.columns:
+        df['SEMANA_FATURA'] = df['SEMANA_FATURA'].fillna(0).astype('int8')
+
+    return df
+
+
+def relatorio_memoria(df_antes, df_depois):
+    """Bytes por coluna antes/depois do esquema (memória profunda, inclui strings)."""
+    antes = df_antes.memory_usage(deep=True, index=False)
+    depois = df_depois.memory_usage(deep=True, index=False)
+    relatorio = pd.DataFrame({'antes': antes, 'depois': depois}).fillna(0).astype('int64')
+    relatorio['economia'] = relatorio['antes'] - relatorio['depois']
+    relatorio.loc['TOTAL'] = relatorio.sum()
+    relatorio['tipo'] = [str(df_depois[c].dtype) if c in df_depois.columns else '-' for c in relatorio.index]
+    return relatorio
+
+
+# ----------------- RELATÓRIO DE MEMÓRIA -----------------
+if __name__ == '__main__':
+    arquivo = sys.argv[1] if len(sys.argv) > 1 else 'gastos_consolidados_final.csv'
+    df_texto = pd.read_csv(arquivo)
+    df_tipado = aplicar_esquema(df_texto)
+
+    relatorio = relatorio_memoria(df_texto, df_tipado)
+    print(f">>> Memória por coluna: {arquivo} ({len(df_texto)} linhas) <<<")
+    print(relatorio.to_string())
+    total = relatorio.loc['TOTAL']
+    if total['depois'] > 0:
+        print(f"\nRedução: {total['antes'] / total['depois']:.1f}x")
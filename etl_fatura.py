@@ -0,0 +1,572 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from armazenamento import (
+    gravar_parquet, limpar_parquet, parquet_disponivel, remover_arquivos_parquet,
+    ARQUIVO_CSV, DIRETORIO_PARQUET,
+)
+from ciclo_fatura import atribuir_mes_fatura, DIA_FECHAMENTO
+from datas_fatura import normalizar_datas
+from esquema import DTYPES_ENTRADA, para_centavos
+
+# =================================================================
+# ETL DAS FATURAS SANTANDER
+# =================================================================
+# gastos_consolidados.csv -> gastos_consolidados_final.csv (+ cópia Parquet)
+#   1. carga       lê o CSV consolidado (inteiro ou em blocos)
+#   2. datas       completa o ano de "dd/mm" e converte para datetime
+#   3. ciclo       MES_FATURA pelo calendário de fechamento
+#   4. semana      SEMANA_FATURA pelo dia do mês
+#   5. analises    comparação mensal e concentração por estabelecimento
+#   6. exportacao  CSV final e dataset Parquet
+# Cada etapa é cronometrada e tem as linhas contadas em RelatorioEtapas.
+# Uso: python etl_fatura.py --help (Pipeline-Santander e
+# analise-semanal-santander.py chamam o mesmo main()).
+
+# --- CONFIGURAÇÃO PADRÃO ---
+COLUNA_DATA = 'Data'
+ARQUIVO_ENTRADA = 'gastos_consolidados.csv'
+ARQUIVO_SAIDA = ARQUIVO_CSV
+TAMANHO_BLOCO = 100_000  # linhas por bloco nos modos streaming/incremental
+ARQUIVO_MANIFESTO = 'manifesto_etl.json'  # faturas já processadas e seus hashes
+GERAR_PARQUET = True  # também grava a cópia colunar lida pelos dashboards
+MODOS = ['memoria', 'streaming', 'incremental', 'paralelo']
+ETAPAS = ['carga', 'datas', 'ciclo', 'semana', 'analises', 'exportacao']
+
+
+class ConfiguracaoETL:
+    """Caminhos e opções de uma execução (os padrões são as constantes acima)."""
+
+    def __init__(self, arquivo_entrada=ARQUIVO_ENTRADA, arquivo_saida=ARQUIVO_SAIDA,
+                 coluna_data=COLUNA_DATA, dia_fechamento=DIA_FECHAMENTO,
+                 tamanho_bloco=TAMANHO_BLOCO, gerar_parquet=GERAR_PARQUET,
+                 diretorio_parquet=DIRETORIO_PARQUET, arquivo_manifesto=ARQUIVO_MANIFESTO,
+                 quiet=False):
+        self.arquivo_entrada = arquivo_entrada
+        self.arquivo_saida = arquivo_saida
+        self.coluna_data = coluna_data
+        self.dia_fechamento = dia_fechamento
+        self.tamanho_bloco = tamanho_bloco
+        self.gerar_parquet = gerar_parquet
+        self.diretorio_parquet = diretorio_parquet
+        self.arquivo_manifesto = arquivo_manifesto
+        self.quiet = quiet
+
+    def log(self, *mensagem):
+        if not self.quiet:
+            print(*mensagem)
+
+
+class RelatorioEtapas:
+    """
+    Segundos e linhas acumulados por etapa. Nos modos em blocos cada etapa
+    soma todos os blocos; no modo paralelo soma o tempo de todos os workers.
+    """
+
+    def __init__(self):
+        self.segundos = dict.fromkeys(ETAPAS, 0.0)
+        self.linhas = dict.fromkeys(ETAPAS, 0)
+        self.total_segundos = 0.0
+
+    @contextmanager
+    def medir(self, etapa, linhas=0):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.adicionar(etapa, time.perf_counter() - inicio, linhas)
+
+    def adicionar(self, etapa, segundos, linhas=0):
+        self.segundos[etapa] += segundos
+        self.linhas[etapa] += int(linhas)
+
+    def combinar(self, outro):
+        for etapa in ETAPAS:
+            self.adicionar(etapa, outro.segundos[etapa], outro.linhas[etapa])
+
+    def tabela(self):
+        tabela = pd.DataFrame({
+            'etapa': ETAPAS,
+            'segundos': [self.segundos[e] for e in ETAPAS],
+            'linhas': [self.linhas[e] for e in ETAPAS],
+        })
+        tabela['linhas_por_s'] = (tabela['linhas'] / tabela['segundos'].where(tabela['segundos'] > 0)).fillna(0)
+        return tabela
+
+    def para_dict(self):
+        return {
+            'total_segundos': self.total_segundos,
+            'etapas': self.tabela().to_dict(orient='records'),
+        }
+
+    def __str__(self):
+        cabecalho = f">>> Tempo por etapa ({self.total_segundos:.3f}s no total) <<<"
+        corpo = self.tabela().to_string(
+            index=False, formatters={'segundos': '{:.3f}'.format, 'linhas_por_s': '{:,.0f}'.format}
+        )
+        return f"{cabecalho}\n{corpo}"
+
+
+# =================================================================
+# TRANSFORMAÇÕES
+# =================================================================
+
+def _transformar(df, cfg, relatorio):
+    """
+    Corrige o ano, cria MES_FATURA/SEMANA_FATURA e ordena as colunas finais.
+    Altera `df` no lugar; quem chama decide se precisa de cópia.
+    """
+    coluna_data = cfg.coluna_data
+    linhas = len(df)
+
+    # Detecta datas sem ano, corrige com base no arquivo e converte para datetime
+    # (cada par Data/Arquivo distinto é interpretado uma única vez)
+    with relatorio.medir('datas', linhas):
+        df[coluna_data] = normalizar_datas(df[coluna_data], df['Arquivo'])
+
+    # Ciclos de fechamento (dia 4 a dia 3 do mês seguinte com fechamento no dia 3)
+    with relatorio.medir('ciclo', linhas):
+        df['MES_FATURA'] = atribuir_mes_fatura(df[coluna_data], cfg.dia_fechamento)
+
+    # Semana pelo dia do mês civil
+    with relatorio.medir('semana', linhas):
+        dia = df[coluna_data].dt.day
+        condicoes_semana = [
+            (dia >= 1) & (dia <= 8),
+            (dia >= 9) & (dia <= 16),
+            (dia >= 17) & (dia <= 23),
+            (dia >= 24) & (dia <= 31)
+        ]
+        valores_semana = [1, 2, 3, 4]
+        df['SEMANA_FATURA'] = np.select(condicoes_semana, valores_semana, default=0)
+
+        cols_finais = ['MES_FATURA', 'SEMANA_FATURA', coluna_data] + [
+            c for c in df.columns if c not in ['MES_FATURA', 'SEMANA_FATURA', coluna_data]
+        ]
+        df = df[cols_finais]
+
+    return df
+
+
+def _ler_blocos(cfg, relatorio, tamanho_bloco=None):
+    """Lê a entrada (inteira ou em blocos), contando o tempo de leitura como 'carga'."""
+    inicio = time.perf_counter()
+    if tamanho_bloco is None:
+        df = pd.read_csv(cfg.arquivo_entrada, dtype=DTYPES_ENTRADA)
+        relatorio.adicionar('carga', time.perf_counter() - inicio, len(df))
+        yield df
+        return
+
+    for bloco in pd.read_csv(cfg.arquivo_entrada, dtype=DTYPES_ENTRADA, chunksize=tamanho_bloco):
+        relatorio.adicionar('carga', time.perf_counter() - inicio, len(bloco))
+        yield bloco
+        inicio = time.perf_counter()
+
+
+# =================================================================
+# ANÁLISES
+# =================================================================
+
+def _somas_parciais(df):
+    """
+    Somas de gastos positivos, em centavos, por Arquivo e por Descrição
+    (inteiras, então combinar blocos não acumula erro de arredondamento).
+    """
+    positivos = df[df['Valor (R$)'] > 0]
+    centavos = para_centavos(positivos['Valor (R$)'])
+    por_arquivo = centavos.groupby(positivos['Arquivo']).sum()
+    por_descricao = centavos.groupby(positivos['Descrição']).sum()
+    return por_arquivo, por_descricao
+
+
+def _montar_analises(por_arquivo, por_descricao):
+    # Somas chegam em centavos; as análises exibem reais
+    por_arquivo = (por_arquivo.astype('int64') / 100).rename('Valor (R$)')
+    por_descricao = (por_descricao.astype('int64') / 100).rename('Valor (R$)')
+
+    # Comparação mensal com os valores menores de 0
+    gastos_mensais = por_arquivo.sort_index().reset_index()
+    gastos_mensais['VARIACAO_%'] = gastos_mensais['Valor (R$)'].pct_change() * 100
+
+    # Concentração de gastos (Top estabelecimentos)
+    concentracao = por_descricao.sort_index().reset_index()
+    concentracao['%_TOTAL'] = (concentracao['Valor (R$)'] / concentracao['Valor (R$)'].sum()) * 100
+    concentracao = concentracao.sort_values(by='Valor (R$)', ascending=False)
+
+    return gastos_mensais, concentracao
+
+
+def _imprimir_analises(cfg, gastos_mensais, concentracao):
+    cfg.log("\n>>> Comparação Mensal <<<")
+    cfg.log(gastos_mensais)
+    cfg.log("\n>>> Concentração de Gastos (Top 5) <<<")
+    cfg.log(concentracao.head(5))
+
+
+# =================================================================
+# EXPORTAÇÃO
+# =================================================================
+
+def _parquet_ativo(cfg):
+    if cfg.gerar_parquet and not parquet_disponivel():
+        cfg.log("AVISO: pyarrow não instalado, cópia Parquet não será gerada.")
+        return False
+    return cfg.gerar_parquet
+
+
+def _analisar_e_exportar(df, cfg, relatorio):
+    with relatorio.medir('analises', len(df)):
+        gastos_mensais, concentracao = _montar_analises(*_somas_parciais(df))
+
+    with relatorio.medir('exportacao', len(df)):
+        df.to_csv(cfg.arquivo_saida, index=False, encoding='utf-8')
+        if _parquet_ativo(cfg):
+            limpar_parquet(cfg.diretorio_parquet)
+            gravar_parquet(df, cfg.diretorio_parquet)
+
+    cfg.log(f"\n--- SUCESSO! Arquivo salvo como: {cfg.arquivo_saida} ---")
+    _imprimir_analises(cfg, gastos_mensais, concentracao)
+
+    return gastos_mensais, concentracao
+
+
+# =================================================================
+# MODOS DE EXECUÇÃO
+# =================================================================
+
+def etl_memoria(cfg, relatorio):
+    """Tudo em memória. Retorna (df, gastos_mensais, concentracao)."""
+    df = next(_ler_blocos(cfg, relatorio))
+    df = _transformar(df, cfg, relatorio)
+    gastos_mensais, concentracao = _analisar_e_exportar(df, cfg, relatorio)
+    return df, gastos_mensais, concentracao
+
+
+def etl_streaming(cfg, relatorio):
+    """
+    Lê `cfg.tamanho_bloco` linhas por vez, transforma, anexa ao CSV de saída
+    e acumula só as somas das análises. O CSV gerado é idêntico ao do modo em
+    memória. Retorna (None, gastos_mensais, concentracao).
+    """
+    total_linhas = 0
+    por_arquivo = None
+    por_descricao = None
+    parquet = _parquet_ativo(cfg)
+    if parquet:
+        limpar_parquet(cfg.diretorio_parquet)
+
+    with open(cfg.arquivo_saida, 'w', encoding='utf-8', newline='') as saida:
+        for i, bloco in enumerate(_ler_blocos(cfg, relatorio, cfg.tamanho_bloco)):
+            df_bloco = _transformar(bloco, cfg, relatorio)
+            with relatorio.medir('exportacao', len(df_bloco)):
+                df_bloco.to_csv(saida, index=False, header=(i == 0))
+                if parquet:
+                    gravar_parquet(df_bloco, cfg.diretorio_parquet, parte=i)
+            total_linhas += len(df_bloco)
+
+            with relatorio.medir('analises', len(df_bloco)):
+                parcial_arquivo, parcial_descricao = _somas_parciais(df_bloco)
+                if por_arquivo is None:
+                    por_arquivo, por_descricao = parcial_arquivo, parcial_descricao
+                else:
+                    por_arquivo = por_arquivo.add(parcial_arquivo, fill_value=0)
+                    por_descricao = por_descricao.add(parcial_descricao, fill_value=0)
+
+    with relatorio.medir('analises'):
+        gastos_mensais, concentracao = _montar_analises(por_arquivo, por_descricao)
+
+    cfg.log(f"\n--- SUCESSO! {total_linhas} linhas salvas em blocos como: {cfg.arquivo_saida} ---")
+    _imprimir_analises(cfg, gastos_mensais, concentracao)
+
+    return None, gastos_mensais, concentracao
+
+
+def _transformar_fatura(arquivo, df_fatura, cfg):
+    """Executado no worker: transforma as linhas de uma fatura e mede as etapas."""
+    relatorio = RelatorioEtapas()
+    inicio = time.perf_counter()
+    df_fatura = _transformar(df_fatura, cfg, relatorio)
+    return arquivo, df_fatura, os.getpid(), time.perf_counter() - inicio, relatorio
+
+
+def etl_paralelo(cfg, relatorio, workers=None):
+    """
+    Divide a entrada por Arquivo e transforma cada fatura num pool de
+    processos (`workers` processos; padrão = núcleos da máquina). Os
+    resultados voltam à ordem original das linhas, então a saída é a mesma
+    do modo em memória. Retorna (df, gastos_mensais, concentracao); o tempo
+    por worker é impresso ao final.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    df_input = next(_ler_blocos(cfg, relatorio))
+    faturas = list(df_input.groupby('Arquivo', sort=False, dropna=False))
+    # Entrada sem linhas: o cabeçalho é transformado aqui mesmo, para a saída
+    # vazia ter as mesmas colunas dos outros modos
+    vazio = df_input.iloc[:0] if not faturas else None
+    del df_input
+
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(faturas) or 1))) as pool:
+        futuros = [pool.submit(_transformar_fatura, arquivo, grupo, cfg) for arquivo, grupo in faturas]
+        resultados = [futuro.result() for futuro in futuros]
+
+    # Ordem determinística: índice original de cada linha
+    if resultados:
+        df = pd.concat([r[1] for r in resultados]).sort_index(kind='stable')
+    else:
+        df = _transformar(vazio, cfg, relatorio)
+    for resultado in resultados:
+        relatorio.combinar(resultado[4])
+
+    por_worker = pd.DataFrame(
+        [{'worker': pid, 'linhas': len(df_fatura), 'segundos': segundos}
+         for _, df_fatura, pid, segundos, _ in resultados],
+        columns=['worker', 'linhas', 'segundos'],
+    )
+    por_worker = por_worker.groupby('worker').agg(
+        faturas=('linhas', 'size'), linhas=('linhas', 'sum'), segundos=('segundos', 'sum')
+    ).reset_index()
+
+    gastos_mensais, concentracao = _analisar_e_exportar(df, cfg, relatorio)
+
+    cfg.log(f"\n>>> Tempo por worker ({workers} processos, {len(faturas)} faturas) <<<")
+    cfg.log(por_worker.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    return df, gastos_mensais, concentracao
+
+
+# =================================================================
+# MODO INCREMENTAL (por fatura de origem)
+# =================================================================
+
+VERSAO_MANIFESTO = 2  # v2: somas por descrição em centavos
+
+
+def _carregar_manifesto(caminho):
+    if not Path(caminho).exists():
+        return {}
+    with open(caminho, encoding='utf-8') as f:
+        conteudo = json.load(f)
+    # Manifesto de outra versão: refaz tudo
+    if conteudo.get('versao') != VERSAO_MANIFESTO:
+        return {}
+    return conteudo.get('arquivos', {})
+
+
+def _salvar_manifesto(caminho, arquivos):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'versao': VERSAO_MANIFESTO, 'arquivos': arquivos}, f, ensure_ascii=False, indent=2)
+
+
+def _hashes_por_arquivo(arquivo_entrada, tamanho_bloco):
+    """
+    Hash do conteúdo de cada fatura (coluna Arquivo), lendo a entrada em
+    blocos. O hash de cada linha é acumulado na ordem do arquivo, então
+    qualquer linha alterada, removida ou reordenada muda o hash da fatura.
+    """
+    hashers = {}
+    for bloco in pd.read_csv(arquivo_entrada, dtype=DTYPES_ENTRADA, chunksize=tamanho_bloco):
+        hashes_linhas = pd.util.hash_pandas_object(bloco, index=False).to_numpy()
+        codigos, arquivos = pd.factorize(bloco['Arquivo'], use_na_sentinel=False)
+        for codigo, arquivo in enumerate(arquivos):
+            arquivo = str(arquivo)
+            if arquivo not in hashers:
+                hashers[arquivo] = hashlib.sha256()
+            hashers[arquivo].update(hashes_linhas[codigos == codigo].tobytes())
+    return {arquivo: h.hexdigest() for arquivo, h in hashers.items()}
+
+
+def _remover_faturas_da_saida(arquivo_saida, arquivos_remover, tamanho_bloco):
+    """Regrava a saída sem as linhas das faturas indicadas (substituição de partição)."""
+    temporario = Path(arquivo_saida).with_suffix('.tmp')
+    # Tudo como texto: as linhas mantidas são regravadas exatamente como estavam
+    leitor = pd.read_csv(arquivo_saida, dtype=str, keep_default_na=False, chunksize=tamanho_bloco)
+    with open(temporario, 'w', encoding='utf-8', newline='') as saida:
+        for i, bloco in enumerate(leitor):
+            bloco = bloco[~bloco['Arquivo'].isin(arquivos_remover)]
+            bloco.to_csv(saida, index=False, header=(i == 0))
+    temporario.replace(arquivo_saida)
+
+
+def etl_incremental(cfg, relatorio):
+    """
+    Processa só as faturas novas ou alteradas desde a última execução.
+
+    O manifesto guarda, por Arquivo, o hash do conteúdo e as somas usadas nas
+    análises. Faturas novas são anexadas ao CSV de saída; alteradas ou
+    removidas têm suas linhas substituídas. O custo de transformação depende
+    só do volume novo, não do histórico (a entrada ainda é lida uma vez para
+    calcular os hashes, tempo contado em 'carga').
+    Retorna (None, gastos_mensais, concentracao).
+    """
+    arquivo_saida = cfg.arquivo_saida
+    manifesto = _carregar_manifesto(cfg.arquivo_manifesto)
+    parquet = _parquet_ativo(cfg)
+    if (not manifesto or not Path(arquivo_saida).exists()
+            or (parquet and not Path(cfg.diretorio_parquet).exists())):
+        # Sem manifesto não há como saber o que a saída contém: recomeça do zero
+        manifesto = {}
+        Path(arquivo_saida).unlink(missing_ok=True)
+        if parquet:
+            limpar_parquet(cfg.diretorio_parquet)
+
+    with relatorio.medir('carga'):
+        hashes = _hashes_por_arquivo(cfg.arquivo_entrada, cfg.tamanho_bloco)
+    pendentes = {arq for arq, h in hashes.items() if manifesto.get(arq, {}).get('hash') != h}
+    substituir = (pendentes | (set(manifesto) - set(hashes))) & set(manifesto)
+
+    if substituir:
+        with relatorio.medir('exportacao'):
+            _remover_faturas_da_saida(arquivo_saida, substituir, cfg.tamanho_bloco)
+            if parquet:
+                remover_arquivos_parquet(substituir, cfg.diretorio_parquet)
+    for arquivo in substituir:
+        del manifesto[arquivo]
+
+    if pendentes:
+        escrever_cabecalho = not Path(arquivo_saida).exists()
+        novos = {arq: {'hash': hashes[arq], 'linhas': 0, 'por_descricao': {}} for arq in pendentes}
+
+        with open(arquivo_saida, 'a', encoding='utf-8', newline='') as saida:
+            for i, bloco in enumerate(_ler_blocos(cfg, relatorio, cfg.tamanho_bloco)):
+                # Cópia: _transformar altera o bloco no lugar
+                bloco = bloco[bloco['Arquivo'].astype(str).isin(pendentes)].copy()
+                if bloco.empty:
+                    continue
+                df_bloco = _transformar(bloco, cfg, relatorio)
+                with relatorio.medir('exportacao', len(df_bloco)):
+                    df_bloco.to_csv(saida, index=False, header=escrever_cabecalho)
+                    if parquet:
+                        gravar_parquet(df_bloco, cfg.diretorio_parquet, parte=i)
+                escrever_cabecalho = False
+
+                with relatorio.medir('analises', len(df_bloco)):
+                    positivos = df_bloco[df_bloco['Valor (R$)'] > 0]
+                    somas = para_centavos(positivos['Valor (R$)']).groupby(
+                        [positivos['Arquivo'], positivos['Descrição']]
+                    ).sum()
+                    for arquivo, linhas in df_bloco['Arquivo'].astype(str).value_counts().items():
+                        novos[arquivo]['linhas'] += int(linhas)
+                    for (arquivo, descricao), centavos in somas.items():
+                        por_descricao = novos[str(arquivo)]['por_descricao']
+                        por_descricao[descricao] = por_descricao.get(descricao, 0) + int(centavos)
+
+        manifesto.update(novos)
+
+    _salvar_manifesto(cfg.arquivo_manifesto, manifesto)
+
+    # Análises a partir das somas guardadas no manifesto (sem reler o histórico)
+    with relatorio.medir('analises'):
+        por_arquivo = pd.Series(
+            {arq: sum(info['por_descricao'].values()) for arq, info in manifesto.items()
+             if info['por_descricao']},
+            dtype='int64'
+        ).rename_axis('Arquivo')
+        por_descricao = pd.Series(dtype='int64')
+        for info in manifesto.values():
+            por_descricao = por_descricao.add(pd.Series(info['por_descricao'], dtype='int64'), fill_value=0)
+        por_descricao = por_descricao.rename_axis('Descrição')
+        gastos_mensais, concentracao = _montar_analises(por_arquivo, por_descricao)
+
+    cfg.log(f"\n--- SUCESSO! {len(pendentes)} fatura(s) nova(s)/alterada(s), "
+            f"{len(substituir)} substituída(s) em: {arquivo_saida} ---")
+    _imprimir_analises(cfg, gastos_mensais, concentracao)
+
+    return None, gastos_mensais, concentracao
+
+
+# =================================================================
+# PONTO DE ENTRADA
+# =================================================================
+
+def executar(cfg=None, modo='memoria', workers=None):
+    """
+    Roda a ETL no `modo` indicado (ver MODOS) e imprime o relatório de etapas
+    (a menos que `cfg.quiet`). Retorna (df, gastos_mensais, concentracao,
+    relatorio); `df` é None nos modos que não mantêm a base em memória.
+    """
+    cfg = cfg or ConfiguracaoETL()
+    if modo not in MODOS:
+        raise ValueError(f"modo desconhecido: {modo!r} (use um de {', '.join(MODOS)})")
+
+    relatorio = RelatorioEtapas()
+    inicio = time.perf_counter()
+    if modo == 'paralelo':
+        df, gastos_mensais, concentracao = etl_paralelo(cfg, relatorio, workers)
+    elif modo == 'incremental':
+        df, gastos_mensais, concentracao = etl_incremental(cfg, relatorio)
+    elif modo == 'streaming':
+        df, gastos_mensais, concentracao = etl_streaming(cfg, relatorio)
+    else:
+        df, gastos_mensais, concentracao = etl_memoria(cfg, relatorio)
+    relatorio.total_segundos = time.perf_counter() - inicio
+
+    cfg.log(f"\n{relatorio}")
+    return df, gastos_mensais, concentracao, relatorio
+
+
+def _argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="ETL das faturas Santander")
+    parser.add_argument('--entrada', default=ARQUIVO_ENTRADA, help="CSV consolidado (padrão: %(default)s)")
+    parser.add_argument('--saida', default=ARQUIVO_SAIDA, help="CSV final (padrão: %(default)s)")
+    parser.add_argument('--dia-fechamento', type=int, default=DIA_FECHAMENTO,
+                        help="dia de fechamento da fatura; o ciclo vai do dia seguinte até ele (padrão: %(default)s)")
+    parser.add_argument('--modo', choices=MODOS, default=None,
+                        help="modo de execução (padrão: memoria, ou paralelo com --workers)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processos do modo paralelo (0 = núcleos da máquina); sem --modo, ativa o modo paralelo")
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO,
+                        help="linhas por bloco nos modos streaming/incremental (padrão: %(default)s)")
+    parser.add_argument('--manifesto', default=ARQUIVO_MANIFESTO, help="manifesto do modo incremental (padrão: %(default)s)")
+    parser.add_argument('--parquet', default=DIRETORIO_PARQUET, help="dataset Parquet gerado (padrão: %(default)s)")
+    parser.add_argument('--sem-parquet', action='store_true', help="não grava a cópia Parquet")
+    parser.add_argument('--relatorio-json', default=None, help="grava o relatório de etapas neste arquivo JSON")
+    parser.add_argument('-q', '--quiet', action='store_true', help="não imprime análises nem relatório")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.modo not in (None, 'paralelo'):
+        parser.error(f"--workers só vale no modo paralelo (recebido --modo {args.modo})")
+    return args
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    cfg = ConfiguracaoETL(
+        arquivo_entrada=args.entrada,
+        arquivo_saida=args.saida,
+        dia_fechamento=args.dia_fechamento,
+        tamanho_bloco=args.tamanho_bloco,
+        gerar_parquet=not args.sem_parquet,
+        diretorio_parquet=args.parquet,
+        arquivo_manifesto=args.manifesto,
+        quiet=args.quiet,
+    )
+    # --workers sem --modo continua ativando o modo paralelo
+    modo = args.modo or ('paralelo' if args.workers is not None else 'memoria')
+
+    try:
+        resultado = executar(cfg, modo, workers=args.workers or None)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo de entrada '{cfg.arquivo_entrada}' não encontrado.")
+        print("Certifique-se de que o arquivo consolidado está no local correto.")
+        return 1
+
+    if args.relatorio_json:
+        relatorio = resultado[3].para_dict()
+        relatorio.update({'modo': modo, 'entrada': cfg.arquivo_entrada})
+        with open(args.relatorio_json, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+# ----------------- INÍCIO DA EXECUÇÃO -----------------
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+import importlib.util
+import io
+
+import pandas as pd
+import streamlit as st
+
+from armazenamento import parquet_disponivel
+from cache_dados import derivado_por_chave
+from esquema import COLUNA_CENTAVOS
+
+# =================================================================
+# EXPORTAÇÃO SOB DEMANDA (CSV, PARQUET, EXCEL)
+# =================================================================
+# O arquivo só é gerado quando alguém clica em baixar (download_button com
+# função em `data`), não a cada rerun. A exportação é bufferizada: o
+# download_button do Streamlit recebe o arquivo inteiro (não aceita gerador),
+# então o pico de memória é o tamanho do arquivo. O CSV é codificado em
+# blocos de linhas nesse buffer, só para não ter o texto inteiro e os bytes
+# ao mesmo tempo. Colunas internas da base (COLUNAS_INTERNAS) não são
+# exportadas. Os bytes ficam em cache por versão da base e chave do filtro
+# (cache_dados.derivado_por_chave), num LRU pequeno: o mesmo recorte baixado
+# de novo, por qualquer sessão, não é regerado.
+# Parquet e Excel aparecem só se pyarrow / openpyxl (ou xlsxwriter) estiverem
+# instalados.
+
+TAMANHO_BLOCO = 100_000
+MAXIMO_EXPORTACOES = 8
+COLUNAS_INTERNAS = [COLUNA_CENTAVOS]  # usadas só nos totais exatos
+
+FORMATOS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def _motor_excel():
+    for motor in ('openpyxl', 'xlsxwriter'):
+        if importlib.util.find_spec(motor) is not None:
+            return motor
+    return None
+
+
+def formatos_disponiveis():
+    disponiveis = ['CSV']
+    if parquet_disponivel():
+        disponiveis.append('Parquet')
+    if _motor_excel() is not None:
+        disponiveis.append('Excel')
+    return disponiveis
+
+
+def blocos_csv(df, tamanho_bloco=TAMANHO_BLOCO):
+    """CSV de `df` em blocos de bytes UTF-8 (cabeçalho só no primeiro)."""
+    for inicio in range(0, max(len(df), 1), tamanho_bloco):
+        yield df.iloc[inicio:inicio + tamanho_bloco].to_csv(index=False, header=(inicio == 0)).encode('utf-8')
+
+
+def exportar(df, formato='CSV'):
+    """Bytes de `df` (sem as colunas internas) no formato pedido (chave de FORMATOS), num buffer."""
+    df = df.drop(columns=COLUNAS_INTERNAS, errors='ignore')
+    saida = io.BytesIO()
+    if formato == 'CSV':
+        for bloco in blocos_csv(df):
+            saida.write(bloco)
+    elif formato == 'Parquet':
+        df.to_parquet(saida, index=False)
+    elif formato == 'Excel':
+        # Excel não aceita datas com fuso
+        datas_com_fuso = [c for c in df.columns if isinstance(df[c].dtype, pd.DatetimeTZDtype)]
+        df = df.assign(**{c: df[c].dt.tz_localize(None) for c in datas_com_fuso})
+        df.to_excel(saida, index=False, engine=_motor_excel())
+    else:
+        raise ValueError(f"formato de exportação desconhecido: {formato!r} (use um de {', '.join(FORMATOS)})")
+    return saida.getvalue()
+
+
+def exportacao_em_cache(chave, formato, gerar_df, colunas=None):
+    """
+    Bytes da exportação de `gerar_df()` em cache por (versão da base, chave,
+    formato); `gerar_df` só é chamado se o arquivo ainda não foi gerado.
+    """
+    return derivado_por_chave('exportacao', (chave, formato), lambda: exportar(gerar_df(), formato),
+                              colunas, MAXIMO_EXPORTACOES)
+
+
+def botao_exportacao(df, chave, nome_base, colunas=None, chave_widget="exportacao"):
+    """
+    Escolha do formato e botão de download de `df` como `nome_base`.<extensão>;
+    o arquivo só é gerado no clique. `chave` identifica o recorte (filtros que
+    produziram `df`) no cache.
+    """
+    formato = st.radio("Formato do arquivo", formatos_disponiveis(), horizontal=True, key=f"{chave_widget}_formato")
+    extensao, mime = FORMATOS[formato]
+    st.download_button(
+        label=f"📥 Baixar dados filtrados ({formato})",
+        data=lambda: exportacao_em_cache(chave, formato, lambda: df, colunas),
+        file_name=f"{nome_base}.{extensao}",
+        mime=mime
+    )
@@ -0,0 +1,184 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# =================================================================
+# EXTRAÇÃO DAS FATURAS EM PDF -> gastos_consolidados.csv
+# =================================================================
+# Lê um diretório de faturas Santander (fatura-*.pdf), extrai as linhas de
+# lançamento ("dd/mm DESCRIÇÃO 1.234,56") e grava no formato de entrada da
+# ETL: Arquivo, Data, Descrição, Valor (R$).
+# - cada PDF é processado num processo separado
+# - o resultado de cada PDF fica em cache pelo hash do conteúdo
+# - as linhas são gravadas no CSV à medida que cada PDF termina (em ordem)
+# Requer pypdf (pip install pypdf).
+
+ARQUIVO_SAIDA = 'gastos_consolidados.csv'
+DIRETORIO_CACHE = '.cache_extracao'
+VERSAO_PARSER = 1  # mudar quando a regra de extração mudar (invalida o cache)
+COLUNAS = ['Arquivo', 'Data', 'Descrição', 'Valor (R$)']
+
+# dd/mm  DESCRIÇÃO  [R$] [-]1.234,56[-]
+PADRAO_LANCAMENTO = re.compile(
+    r'^\s*(?P<data>\d{2}/\d{2})\s+(?P<descricao>.+?)\s+'
+    r'(?:R\$\s*)?(?P<sinal>-)?\s*(?P<valor>\d{1,3}(?:\.\d{3})*,\d{2})(?P<sinal_final>-)?\s*$'
+)
+
+
+def _hash_arquivo(caminho):
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _valor_brasileiro(texto, negativo):
+    valor = float(texto.replace('.', '').replace(',', '.'))
+    return -valor if negativo else valor
+
+
+def extrair_lancamentos(texto, arquivo):
+    """Linhas de lançamento encontradas no texto de uma fatura."""
+    linhas = []
+    for linha in texto.splitlines():
+        encontrado = PADRAO_LANCAMENTO.match(linha)
+        if not encontrado:
+            continue
+        negativo = bool(encontrado['sinal'] or encontrado['sinal_final'])
+        linhas.append({
+            'Arquivo': arquivo,
+            'Data': encontrado['data'],
+            'Descrição': encontrado['descricao'].strip(),
+            'Valor (R$)': _valor_brasileiro(encontrado['valor'], negativo),
+        })
+    return linhas
+
+
+def extrair_texto(caminho):
+    from pypdf import PdfReader
+
+    leitor = PdfReader(caminho)
+    return '\n'.join(pagina.extract_text() or '' for pagina in leitor.pages)
+
+
+def extrair_pdf(caminho, diretorio_cache=DIRETORIO_CACHE):
+    """
+    Executado no worker: lançamentos de um PDF, usando o cache quando o
+    mesmo conteúdo já foi extraído. Retorna (linhas, veio_do_cache, segundos).
+    """
+    inicio = time.perf_counter()
+    caminho = Path(caminho)
+    chave = f"{_hash_arquivo(caminho)}-v{VERSAO_PARSER}"
+    arquivo_cache = Path(diretorio_cache) / f"{chave}.json"
+
+    if arquivo_cache.exists():
+        with open(arquivo_cache, encoding='utf-8') as f:
+            linhas = json.load(f)
+        # O mesmo conteúdo pode ter sido salvo com outro nome
+        for linha in linhas:
+            linha['Arquivo'] = caminho.name
+        return linhas, True, time.perf_counter() - inicio
+
+    linhas = extrair_lancamentos(extrair_texto(caminho), caminho.name)
+
+    Path(diretorio_cache).mkdir(parents=True, exist_ok=True)
+    temporario = arquivo_cache.with_suffix(f'.{os.getpid()}.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(linhas, f, ensure_ascii=False)
+    temporario.replace(arquivo_cache)
+
+    return linhas, False, time.perf_counter() - inicio
+
+
+def extrair_diretorio(diretorio, saida=ARQUIVO_SAIDA, workers=None, padrao='fatura-*.pdf',
+                      diretorio_cache=DIRETORIO_CACHE):
+    """
+    Extrai todos os PDFs de `diretorio` em paralelo e grava as linhas em
+    `saida`, na ordem dos nomes de arquivo. Retorna um resumo por PDF.
+    """
+    pdfs = sorted(Path(diretorio).glob(padrao))
+    workers = workers or os.cpu_count() or 1
+    resumo = []
+
+    # Mesmo formato do gastos_consolidados.csv original (UTF-8 com BOM)
+    with open(saida, 'w', encoding='utf-8-sig', newline='') as f:
+        escritor = csv.DictWriter(f, fieldnames=COLUNAS, lineterminator='\n')
+        escritor.writeheader()
+        if pdfs:
+            with ProcessPoolExecutor(max_workers=max(1, min(workers, len(pdfs)))) as pool:
+                resultados = pool.map(extrair_pdf, pdfs, [diretorio_cache] * len(pdfs))
+                for pdf, (linhas, do_cache, segundos) in zip(pdfs, resultados):
+                    escritor.writerows(linhas)
+                    resumo.append({'arquivo': pdf.name, 'linhas': len(linhas),
+                                   'cache': do_cache, 'segundos': segundos})
+
+    return resumo
+
+
+# =================================================================
+# PDF DE EXEMPLO (para testar sem faturas reais)
+# =================================================================
+
+def _escapar_pdf(texto):
+    return texto.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def gerar_pdf_exemplo(caminho, linhas, titulo='SANTANDER - FATURA DO CARTÃO'):
+    """
+    Grava um PDF simples de uma página com `linhas` de texto, no layout
+    "dd/mm DESCRIÇÃO 1.234,56", sem depender de bibliotecas externas.
+    """
+    conteudo = ['BT', '/F1 10 Tf', '14 TL', '40 800 Td', f'({_escapar_pdf(titulo)}) Tj', 'T*']
+    for linha in linhas:
+        conteudo += [f'({_escapar_pdf(linha)}) Tj', 'T*']
+    conteudo.append('ET')
+    fluxo = '\n'.join(conteudo).encode('latin-1', errors='replace')
+
+    objetos = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+        b'/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>',
+        b'<< /Length ' + str(len(fluxo)).encode() + b' >>\nstream\n' + fluxo + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+
+    dados = bytearray(b'%PDF-1.4\n')
+    posicoes = []
+    for numero, objeto in enumerate(objetos, start=1):
+        posicoes.append(len(dados))
+        dados += f'{numero} 0 obj\n'.encode() + objeto + b'\nendobj\n'
+    inicio_xref = len(dados)
+    dados += f'xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n'.encode()
+    for posicao in posicoes:
+        dados += f'{posicao:010d} 00000 n \n'.encode()
+    dados += (f'trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\n'
+              f'startxref\n{inicio_xref}\n%%EOF\n').encode()
+
+    Path(caminho).write_bytes(bytes(dados))
+
+
+# ----------------- INÍCIO DA EXECUÇÃO -----------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Extrai as faturas Santander em PDF para o CSV consolidado")
+    parser.add_argument('diretorio', help="diretório com os arquivos fatura-*.pdf")
+    parser.add_argument('--saida', default=ARQUIVO_SAIDA, help="CSV gerado (padrão: %(default)s)")
+    parser.add_argument('--workers', type=int, default=None, help="processos em paralelo (padrão: núcleos da máquina)")
+    parser.add_argument('--cache', default=DIRETORIO_CACHE, help="diretório do cache por hash (padrão: %(default)s)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resumo = extrair_diretorio(args.diretorio, args.saida, args.workers, diretorio_cache=args.cache)
+
+    for item in resumo:
+        origem = 'cache' if item['cache'] else 'pdf'
+        print(f"   - {item['arquivo']}: {item['linhas']} linhas ({origem}, {item['segundos']:.2f}s)")
+    print(f"\n--- SUCESSO! {sum(i['linhas'] for i in resumo)} linhas de {len(resumo)} PDFs "
+          f"salvas em {args.saida} ({time.perf_counter() - inicio:.2f}s) ---")
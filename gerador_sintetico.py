@@ -0,0 +1,147 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from esquema import COLUNA_DATA, COLUNA_VALOR
+
+# =================================================================
+# GERADOR DE FATURAS SINTÉTICAS
+# =================================================================
+# Gera um gastos_consolidados.csv de qualquer tamanho, no mesmo formato do
+# original (Arquivo, Data "dd/mm" sem ano, Descrição, Valor (R$), UTF-8 com
+# BOM), para medir ETL e dashboards em escala (ver benchmark.py).
+# - faturas com os nomes usados pelo banco (fatura-jan.pdf, fatura-maio.pdf, ...);
+#   acima de 12 faturas, um sufixo por cartão (fatura-jan-c02.pdf)
+# - datas no ciclo da fatura (até ~2 meses antes do fechamento), algumas parcelas antigas
+# - estabelecimentos com popularidade desigual e as variações de grafia do
+#   extrato ("MP *MELIMAIS" / "MP*MELIMAIS", "TIM*21980595816")
+# - pagamentos de fatura e estornos com valor negativo
+# A mesma semente e o mesmo tamanho de bloco geram sempre o mesmo arquivo.
+
+ESCALAS = {'10k': 10_000, '1M': 1_000_000, '10M': 10_000_000}
+SEMENTE = 42
+TAMANHO_BLOCO = 1_000_000
+
+# (nome no arquivo, mês) — nomes como aparecem nas faturas reais
+FATURAS = [
+    ('jan', 1), ('fev', 2), ('mar', 3), ('abr', 4), ('maio', 5), ('junho', 6),
+    ('julho', 7), ('agosto', 8), ('setembro', 9), ('outubro', 10), ('nov', 11), ('dezembro', 12),
+]
+ANO_FATURAS = 2025
+
+ESTABELECIMENTOS = [
+    'SUPERMERCADO GUANABARA', 'REDERJ', 'GOOGLE YOUTUBE MEMBER', 'ANUIDADE DIFERENCIADA',
+    'MP *MELIMAIS', 'EC *MELIMAIS', 'GRUPO OLX 1599F9471E', 'PRODUTOS GLOBO', 'NETFLIX COM',
+    'PERFUMARIA LURDES', 'DROGARIA DROGA XIII LT', 'SHOPEE *MONTECRISTOALU', 'SHOPEE *CASADECORADAEN',
+    'SHOPEE *BORDADOSATHENA', 'SHOPEE ENXOVAISJOSU', 'IFOOD *RESTAURANTE', 'UBER *TRIP',
+    '99 *POP', 'POSTO SHELL', 'PADARIA PAO DOURADO', 'AMAZON MARKETPLACE', 'MAGALU *LOJA',
+    'SPOTIFY', 'RAIA DROGASIL', 'HORTIFRUTI', 'CASAS BAHIA', 'RENNER', 'CINEMARK',
+]
+PAGAMENTOS = ['PAGAMENTO DE FATURA', 'PAGAMENTO DE FATURA-INTERNET', 'PARC SALDO DE FATURA']
+FRACAO_PAGAMENTOS = 0.03
+FRACAO_ESTORNOS = 0.005
+FRACAO_PARCELAS = 0.05
+
+
+def _variantes(nome):
+    # O extrato às vezes traz o nome sem espaços
+    return [nome, nome.replace(' ', '')]
+
+
+def _catalogo(rng, n_telefones=40):
+    """Descrições possíveis e o peso (popularidade) de cada uma."""
+    nomes = [v for nome in ESTABELECIMENTOS for v in _variantes(nome)]
+    nomes += [f"TIM*{numero}" for numero in rng.integers(21_900_000_000, 21_999_999_999, n_telefones)]
+    # Popularidade tipo Zipf: poucos estabelecimentos concentram o gasto
+    pesos = 1 / np.arange(1, len(nomes) + 1) ** 1.1
+    ordem = rng.permutation(len(nomes))
+    return np.array(nomes, dtype=object)[ordem], pesos / pesos.sum()
+
+
+def _arquivos(n_faturas):
+    nomes = []
+    for i in range(n_faturas):
+        nome, mes = FATURAS[i % len(FATURAS)]
+        cartao = i // len(FATURAS)
+        sufixo = f"-c{cartao + 1:02d}" if n_faturas > len(FATURAS) else ''
+        nomes.append((f"fatura-{nome}{sufixo}.pdf", mes))
+    return nomes
+
+
+def _bloco(rng, n, arquivos, descricoes, pesos):
+    idx_fatura = rng.integers(0, len(arquivos), n)
+    nomes_arquivo = np.array([nome for nome, _ in arquivos], dtype=object)[idx_fatura]
+
+    # Fechamento no dia 3 do mês da fatura; compras até ~60 dias antes,
+    # parcelas até ~10 meses antes
+    fechamentos = np.array([f'{ANO_FATURAS}-{mes:02d}-03' for _, mes in arquivos], dtype='datetime64[D]')
+    dias_antes = rng.integers(0, 60, n)
+    parcela = rng.random(n) < FRACAO_PARCELAS
+    dias_antes[parcela] = rng.integers(60, 300, parcela.sum())
+    datas = fechamentos[idx_fatura] - dias_antes.astype('timedelta64[D]')
+
+    # Cada data distinta é formatada uma vez
+    codigos, unicas = pd.factorize(datas)
+    texto_data = np.asarray(pd.DatetimeIndex(unicas).strftime('%d/%m'), dtype=object)[codigos]
+
+    descricao = descricoes[rng.choice(len(descricoes), n, p=pesos)]
+    valor = np.round(rng.lognormal(mean=3.4, sigma=1.0, size=n), 2)
+    valor = np.maximum(valor, 0.01)
+
+    # Pagamentos da fatura (valores altos negativos) e estornos pequenos
+    sorteio = rng.random(n)
+    pagamento = sorteio < FRACAO_PAGAMENTOS
+    estorno = (sorteio >= FRACAO_PAGAMENTOS) & (sorteio < FRACAO_PAGAMENTOS + FRACAO_ESTORNOS)
+    descricao[pagamento] = np.array(PAGAMENTOS, dtype=object)[rng.integers(0, len(PAGAMENTOS), pagamento.sum())]
+    valor[pagamento] = -np.round(rng.uniform(300, 900, pagamento.sum()), 2)
+    valor[estorno] = -valor[estorno]
+
+    return pd.DataFrame({
+        'Arquivo': nomes_arquivo,
+        COLUNA_DATA: texto_data,
+        'Descrição': descricao,
+        COLUNA_VALOR: valor,
+    })
+
+
+def gerar_gastos(caminho, linhas, semente=SEMENTE, n_faturas=None, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Grava `linhas` lançamentos sintéticos em `caminho`. Por padrão uma
+    fatura por ~1.000 linhas (mínimo 12, como um ano de faturas).
+    Retorna o número de linhas gravadas.
+    """
+    rng = np.random.default_rng(semente)
+    n_faturas = n_faturas or max(len(FATURAS), linhas // 1_000)
+    arquivos = _arquivos(n_faturas)
+    descricoes, pesos = _catalogo(rng)
+
+    gravadas = 0
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as saida:
+        while gravadas < linhas:
+            n = min(tamanho_bloco, linhas - gravadas)
+            _bloco(rng, n, arquivos, descricoes, pesos).to_csv(saida, index=False, header=(gravadas == 0))
+            gravadas += n
+    return gravadas
+
+
+def _linhas(texto):
+    if texto in ESCALAS:
+        return ESCALAS[texto]
+    return int(texto.replace('_', ''))
+
+
+# ----------------- INÍCIO DA EXECUÇÃO -----------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera faturas sintéticas no formato de gastos_consolidados.csv")
+    parser.add_argument('linhas', type=_linhas, help=f"número de linhas ou escala ({', '.join(ESCALAS)})")
+    parser.add_argument('--saida', default=None, help="CSV gerado (padrão: gastos_sinteticos_<linhas>.csv)")
+    parser.add_argument('--semente', type=int, default=SEMENTE, help="semente do gerador (padrão: %(default)s)")
+    parser.add_argument('--faturas', type=int, default=None, help="número de faturas (padrão: ~1 a cada 1.000 linhas)")
+    args = parser.parse_args()
+
+    saida = args.saida or f"gastos_sinteticos_{args.linhas}.csv"
+    inicio = time.perf_counter()
+    total = gerar_gastos(saida, args.linhas, args.semente, args.faturas)
+    print(f"--- SUCESSO! {total} linhas sintéticas salvas em {saida} ({time.perf_counter() - inicio:.2f}s) ---")
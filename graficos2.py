@@ -5,23 +5,35 @@ import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
 
+import cubo_gastos
+from cache_dados import carregar_base, derivado_por_chave
+from indice_linhas import indice_base
+from insights_gastos import gerar_insights
+from pareto_gastos import pareto_filtro
+from periodos_fatura import periodos_base
+from tabela_paginada import exibir_tabela, ordem_base
+from busca_estabelecimentos import indice_busca, ROTULOS_BUSCA
+from exportacao import botao_exportacao
+
+# Colunas usadas pelo dashboard (as demais nem são lidas do disco)
+COLUNAS_DASHBOARD = ['MES_FATURA', 'SEMANA_FATURA', 'Data', 'Arquivo', 'Descrição', 'Valor (R$)', 'Categoria']
+
 # Configuração da página
 st.set_page_config(page_title="Dashboard Cartão", layout="wide", page_icon="💳")
 
-# --- Carregar dados ---
-df = pd.read_csv("gastos_consolidados_final.csv")
-
-# Converter data se necessário
-if 'Data' in df.columns:
-    df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
-    df['Mes'] = df['Data'].dt.to_period('M').astype(str)
-    df['Dia_Semana'] = df['Data'].dt.day_name()
 st.title("💳 Dashboard Inteligente de Gastos do Cartão")
 
+# --- Carregar dados ---
+# Base inteira em cache no processo; as fatias saem do índice de posições e os
+# totais por fatura da tabela de períodos (na ordem do ciclo MES_FATURA)
+df = carregar_base(COLUNAS_DASHBOARD)
+indice = indice_base(COLUNAS_DASHBOARD)
+periodos = periodos_base(COLUNAS_DASHBOARD)
+
 # --- Filtros ---
 col1, col2 = st.columns(2)
 with col1:
-    opcoes = ["Resumo Total"] + sorted(df['Arquivo'].dropna().unique().tolist())
+    opcoes = ["Resumo Total"] + periodos.ordem
     fatura_selecionada = st.selectbox("📅 Selecione a fatura:", opcoes)
 
 with col2:
@@ -33,38 +45,30 @@ with col2:
         categoria_selecionada = "Todas"
 
 # --- Definir base filtrada ---
-if fatura_selecionada == "Resumo Total":
-    df_filtrado = df.copy()
-else:
-    df_filtrado = df[df['Arquivo'] == fatura_selecionada]
-
-if categoria_selecionada != "Todas" and 'Categoria' in df.columns:
-    df_filtrado = df_filtrado[df_filtrado['Categoria'] == categoria_selecionada]
+# Fatias pelo índice de posições (indice_linhas.py): só as linhas da seleção são tocadas
+filtro = {
+    'arquivo': None if fatura_selecionada == "Resumo Total" else fatura_selecionada,
+    'categoria': None if categoria_selecionada == "Todas" else categoria_selecionada,
+}
+chave_filtro = (filtro['arquivo'], filtro['categoria'])  # chave dos resultados em cache por seção
 
 # ========================================
 # 1. CARDS DE KPIs PRINCIPAIS (TOPO)
 # ========================================
 st.subheader("📊 Visão Geral")
 
-# Calcular métricas
-gastos_positivos = df_filtrado[df_filtrado['Valor (R$)'] > 0]
-total_gasto = gastos_positivos['Valor (R$)'].sum()
-qtd_transacoes = len(gastos_positivos)
-ticket_medio = total_gasto / qtd_transacoes if qtd_transacoes > 0 else 0
-maior_compra = gastos_positivos['Valor (R$)'].max() if len(gastos_positivos) > 0 else 0
-
-# Comparação com mês anterior (se possível)
-if fatura_selecionada != "Resumo Total" and len(opcoes) > 2:
-    idx_atual = opcoes.index(fatura_selecionada)
-    if idx_atual > 1:  # Tem mês anterior
-        fatura_anterior = opcoes[idx_atual - 1]
-        df_anterior = df[df['Arquivo'] == fatura_anterior]
-        total_anterior = df_anterior[df_anterior['Valor (R$)'] > 0]['Valor (R$)'].sum()
-        variacao = ((total_gasto - total_anterior) / total_anterior * 100) if total_anterior > 0 else 0
-    else:
-        variacao = 0
-else:
-    variacao = 0
+# KPIs e gráficos saem do cubo de agregados (cubo_gastos.py), não das linhas
+cubo = cubo_gastos.cubo_base(COLUNAS_DASHBOARD)
+cubo_filtrado = cubo_gastos.filtrar(cubo, **filtro)
+indicadores = cubo_gastos.kpis(cubo_filtrado)
+pareto = pareto_filtro(COLUNAS_DASHBOARD, **filtro)  # totais por estabelecimento, em cache por filtro
+total_gasto = indicadores['total']  # soma exata em centavos
+qtd_transacoes = indicadores['qtd']
+ticket_medio = indicadores['ticket_medio']
+maior_compra = indicadores['maior']
+
+# Comparação com a fatura anterior no ciclo (consulta à tabela de períodos)
+variacao = periodos.variacao(filtro['arquivo'], filtro['categoria']) if filtro['arquivo'] else 0
 
 # Cards em colunas
 col1, col2, col3, col4 = st.columns(4)
@@ -99,66 +103,91 @@ with col4:
 
 st.divider()
 
+
+# ========================================
+# SEÇÕES SOB DEMANDA
+# ========================================
+# Só a aba aberta é calculada (on_change="rerun" + .open). Cada seção é um
+# fragmento: mexer nos campos dela (meta, valor mínimo, busca, página) reexecuta
+# só a própria seção, não o painel inteiro. Os dados de cada seção ficam em
+# cache por versão da base e filtro (cache_dados.derivado_por_chave).
+aba_padroes, aba_evolucao, aba_alertas, aba_metas, aba_transacoes = st.tabs(
+    ["📅 Padrões", "📈 Evolução", "🚨 Alertas", "🎯 Metas", "🔍 Transações"],
+    key="secao",
+    on_change="rerun"
+)
+
+
 # ========================================
 # 2. ANÁLISE DE FREQUÊNCIA E PADRÕES
 # ========================================
-col1, col2 = st.columns(2)
+def _frequencia_dia(cubo_filtrado):
+    ordem_dias = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    nomes_dias = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
 
-with col1:
-    st.subheader("📅 Frequência de Gastos por Dia da Semana")
-    if 'Dia_Semana' in df_filtrado.columns:
-        ordem_dias = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        nomes_dias = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
-        
-        freq_dia = gastos_positivos.groupby('Dia_Semana')['Valor (R$)'].agg(['sum', 'count']).reset_index()
-        freq_dia['Dia_Semana'] = pd.Categorical(freq_dia['Dia_Semana'], categories=ordem_dias, ordered=True)
-        freq_dia = freq_dia.sort_values('Dia_Semana')
-        freq_dia['Dia_PT'] = nomes_dias[:len(freq_dia)]
-        
-        fig = px.bar(freq_dia, x='Dia_PT', y='sum', 
-                     labels={'sum': 'Total (R$)', 'Dia_PT': 'Dia da Semana'},
-                     color='sum', color_continuous_scale='Blues')
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("Adicione uma coluna 'Data' para ver esta análise")
+    freq_dia = cubo_gastos.por(cubo_filtrado, 'Dia_Semana')[['Valor (R$)', 'Qtd']].reset_index()
+    freq_dia.columns = ['Dia_Semana', 'sum', 'count']
+    freq_dia['Dia_Semana'] = pd.Categorical(freq_dia['Dia_Semana'], categories=ordem_dias, ordered=True)
+    freq_dia = freq_dia.sort_values('Dia_Semana')
+    freq_dia['Dia_PT'] = nomes_dias[:len(freq_dia)]
+    return freq_dia
 
-with col2:
-    st.subheader("🏪 Top 5 Estabelecimentos")
-    top_estab = gastos_positivos.groupby('Descrição')['Valor (R$)'].sum().reset_index()
-    top_estab['%_TOTAL'] = (top_estab['Valor (R$)'] / total_gasto) * 100
-    top_estab = top_estab.sort_values(by='Valor (R$)', ascending=False).head(5)
-    
-    fig = px.bar(top_estab, x='Valor (R$)', y='Descrição', 
-                 orientation='h',
-                 text='%_TOTAL',
-                 labels={'Valor (R$)': 'Total Gasto', 'Descrição': 'Estabelecimento'})
-    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
-    st.plotly_chart(fig, use_container_width=True)
 
-st.divider()
+@st.fragment
+def secao_padroes(chave_filtro, cubo_filtrado, pareto):
+    col1, col2 = st.columns(2)
 
+    with col1:
+        st.subheader("📅 Frequência de Gastos por Dia da Semana")
+        if 'Dia_Semana' in df.columns:
+            freq_dia = derivado_por_chave('secao_frequencia', chave_filtro,
+                                          lambda: _frequencia_dia(cubo_filtrado), COLUNAS_DASHBOARD)
+
+            fig = px.bar(freq_dia, x='Dia_PT', y='sum',
+                         labels={'sum': 'Total (R$)', 'Dia_PT': 'Dia da Semana'},
+                         color='sum', color_continuous_scale='Blues')
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Adicione uma coluna 'Data' para ver esta análise")
+
+    with col2:
+        st.subheader("🏪 Top 5 Estabelecimentos")
+        top_estab = pareto.top(5).rename(columns={'%': '%_TOTAL'})
+
+        fig = px.bar(top_estab, x='Valor (R$)', y='Descrição',
+                     orientation='h',
+                     text='%_TOTAL',
+                     labels={'Valor (R$)': 'Total Gasto', 'Descrição': 'Estabelecimento'})
+        fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+        st.plotly_chart(fig, use_container_width=True)
+
+
+with aba_padroes:
+    if aba_padroes.open:
+        secao_padroes(chave_filtro, cubo_filtrado, pareto)
 
 
 # ========================================
 # 4. EVOLUÇÃO TEMPORAL E TENDÊNCIAS
 # ========================================
-st.subheader("📈 Evolução e Tendências")
-
-if fatura_selecionada == "Resumo Total":
-    # Análise temporal
-    evolucao = df[df['Valor (R$)'] > 0].groupby('Arquivo').agg({
-        'Valor (R$)': ['sum', 'count', 'mean']
-    }).reset_index()
-    evolucao.columns = ['Fatura', 'Total', 'Qtd', 'Ticket_Medio']
-    evolucao['Variacao_%'] = evolucao['Total'].pct_change() * 100
-    
+@st.fragment
+def secao_evolucao(fatura_selecionada, periodos):
+    st.subheader("📈 Evolução e Tendências")
+
+    if fatura_selecionada != "Resumo Total":
+        st.info("Selecione \"Resumo Total\" para ver a evolução entre faturas")
+        return
+
+    # Análise temporal: linhas prontas da tabela de períodos, na ordem do ciclo
+    evolucao = periodos.evolucao()
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         # Gráfico de linha com área
         fig = go.Figure()
         fig.add_trace(go.Scatter(
-            x=evolucao['Fatura'], 
+            x=evolucao['Fatura'],
             y=evolucao['Total'],
             mode='lines+markers',
             name='Total Gasto',
@@ -172,11 +201,8 @@ if fatura_selecionada == "Resumo Total":
             hovermode='x unified'
         )
         st.plotly_chart(fig, use_container_width=True)
-    
+
     with col2:
-        # Média móvel e tendência
-        evolucao['Media_Movel_3'] = evolucao['Total'].rolling(window=3, min_periods=1).mean()
-        
         fig = go.Figure()
         fig.add_trace(go.Bar(
             x=evolucao['Fatura'],
@@ -196,7 +222,7 @@ if fatura_selecionada == "Resumo Total":
             yaxis_title='Valor (R$)'
         )
         st.plotly_chart(fig, use_container_width=True)
-    
+
     # Tabela de evolução
     st.dataframe(
         evolucao.style.format({
@@ -208,190 +234,192 @@ if fatura_selecionada == "Resumo Total":
         hide_index=True
     )
 
-st.divider()
+
+with aba_evolucao:
+    if aba_evolucao.open:
+        secao_evolucao(fatura_selecionada, periodos)
+
 
 # ========================================
 # 5. ALERTAS E INSIGHTS INTELIGENTES
 # ========================================
-st.subheader("🚨 Alertas e Insights")
-
-insights = []
-
-# Detectar gastos atípicos
-if len(gastos_positivos) > 0:
-    media = gastos_positivos['Valor (R$)'].mean()
-    desvio = gastos_positivos['Valor (R$)'].std()
-    outliers = gastos_positivos[gastos_positivos['Valor (R$)'] > (media + 2 * desvio)]
-    
-    if len(outliers) > 0:
-        insights.append({
-            'tipo': '⚠️ Atenção',
-            'mensagem': f'Detectadas {len(outliers)} compras atípicas (acima da média + 2 desvios)',
-            'detalhes': outliers[['Descrição', 'Valor (R$)']].to_dict('records')
-        })
-
-# Comparar com mês anterior
-if variacao > 20:
-    insights.append({
-        'tipo': '📈 Aumento Significativo',
-        'mensagem': f'Seus gastos aumentaram {variacao:.1f}% em relação ao mês anterior',
-        'detalhes': None
-    })
-elif variacao < -20:
-    insights.append({
-        'tipo': '📉 Economia',
-        'mensagem': f'Parabéns! Você economizou {abs(variacao):.1f}% em relação ao mês anterior',
-        'detalhes': None
-    })
-
-# Categoria com maior crescimento
-if fatura_selecionada == "Resumo Total" and 'Categoria' in df.columns:
-    for cat in df['Categoria'].unique():
-        cat_atual = df_filtrado[df_filtrado['Categoria'] == cat]['Valor (R$)'].sum()
-        if idx_atual > 1:
-            cat_anterior = df_anterior[df_anterior['Categoria'] == cat]['Valor (R$)'].sum()
-            if cat_anterior > 0:
-                var_cat = ((cat_atual - cat_anterior) / cat_anterior) * 100
-                if var_cat > 50:
-                    insights.append({
-                        'tipo': '🔥 Categoria em Alta',
-                        'mensagem': f'Gastos com "{cat}" aumentaram {var_cat:.1f}%',
-                        'detalhes': None
-                    })
-
-# Exibir insights
-if insights:
-    for insight in insights:
-        with st.expander(f"{insight['tipo']}: {insight['mensagem']}", expanded=True):
-            if insight['detalhes']:
-                st.dataframe(pd.DataFrame(insight['detalhes']))
-else:
-    st.info("✅ Nenhum alerta detectado. Seus gastos estão dentro do padrão!")
+def _insights(filtro, indicadores, cubo, ordem_faturas):
+    insights = []
+    gastos_positivos = indice.selecionar(df, positivos=True, **filtro)
+
+    # Detectar gastos atípicos
+    if len(gastos_positivos) > 0:
+        # Média e desvio vêm do cubo; só a seleção das compras usa as linhas
+        limite = indicadores['media'] + 2 * indicadores['desvio']
+        outliers = gastos_positivos[gastos_positivos['Valor (R$)'] > limite]
+
+        if len(outliers) > 0:
+            insights.append({
+                'tipo': '⚠️ Atenção',
+                'mensagem': f'Detectadas {len(outliers)} compras atípicas (acima da média + 2 desvios)',
+                'detalhes': outliers[['Descrição', 'Valor (R$)']].to_dict('records')
+            })
+
+    # Variação contra a fatura anterior (total, por categoria e por estabelecimento),
+    # de um pivô fatura x chave do cubo; no Resumo Total, a fatura mais recente
+    cubo_categoria = cubo_gastos.filtrar(cubo, categoria=filtro['categoria'])
+    insights += gerar_insights(cubo_categoria, ordem_faturas, fatura=filtro['arquivo'])
+    return insights
+
+
+@st.fragment
+def secao_alertas(chave_filtro, filtro, indicadores, cubo, ordem_faturas):
+    st.subheader("🚨 Alertas e Insights")
+
+    insights = derivado_por_chave('secao_alertas', chave_filtro,
+                                  lambda: _insights(filtro, indicadores, cubo, ordem_faturas), COLUNAS_DASHBOARD)
+
+    # Exibir insights
+    if insights:
+        for insight in insights:
+            with st.expander(f"{insight['tipo']}: {insight['mensagem']}", expanded=True):
+                if insight['detalhes']:
+                    st.dataframe(pd.DataFrame(insight['detalhes']))
+    else:
+        st.info("✅ Nenhum alerta detectado. Seus gastos estão dentro do padrão!")
+
+
+with aba_alertas:
+    if aba_alertas.open:
+        secao_alertas(chave_filtro, filtro, indicadores, cubo, periodos.ordem)
 
-st.divider()
 
 # ========================================
 # 6. PROJEÇÕES E METAS
 # ========================================
-st.subheader("🎯 Metas e Projeções")
+def _dias_decorridos(filtro):
+    if 'Data' not in df.columns:
+        return None
+    datas = indice.selecionar(df, **filtro)['Data']
+    return datas.dt.day.max() if len(datas) > 0 else None
 
-col1, col2 = st.columns(2)
 
-with col1:
-    # Definir meta mensal
-    meta_mensal = st.number_input(
-        "💰 Defina sua meta de gastos mensal (R$):",
-        min_value=0.0,
-        value=5000.0,
-        step=100.0
-    )
-    
-    percentual_gasto = (total_gasto / meta_mensal * 100) if meta_mensal > 0 else 0
-    
-    # Gráfico de progresso
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number+delta",
-        value=total_gasto,
-        domain={'x': [0, 1], 'y': [0, 1]},
-        title={'text': "Gasto Atual vs Meta"},
-        delta={'reference': meta_mensal},
-        gauge={
-            'axis': {'range': [None, meta_mensal * 1.2]},
-            'bar': {'color': "darkblue"},
-            'steps': [
-                {'range': [0, meta_mensal * 0.7], 'color': "lightgreen"},
-                {'range': [meta_mensal * 0.7, meta_mensal], 'color': "yellow"},
-                {'range': [meta_mensal, meta_mensal * 1.2], 'color': "red"}
-            ],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.75,
-                'value': meta_mensal
+@st.fragment
+def secao_metas(chave_filtro, filtro, total_gasto):
+    st.subheader("🎯 Metas e Projeções")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Definir meta mensal
+        meta_mensal = st.number_input(
+            "💰 Defina sua meta de gastos mensal (R$):",
+            min_value=0.0,
+            value=5000.0,
+            step=100.0
+        )
+
+        percentual_gasto = (total_gasto / meta_mensal * 100) if meta_mensal > 0 else 0
+
+        # Gráfico de progresso
+        fig = go.Figure(go.Indicator(
+            mode="gauge+number+delta",
+            value=total_gasto,
+            domain={'x': [0, 1], 'y': [0, 1]},
+            title={'text': "Gasto Atual vs Meta"},
+            delta={'reference': meta_mensal},
+            gauge={
+                'axis': {'range': [None, meta_mensal * 1.2]},
+                'bar': {'color': "darkblue"},
+                'steps': [
+                    {'range': [0, meta_mensal * 0.7], 'color': "lightgreen"},
+                    {'range': [meta_mensal * 0.7, meta_mensal], 'color': "yellow"},
+                    {'range': [meta_mensal, meta_mensal * 1.2], 'color': "red"}
+                ],
+                'threshold': {
+                    'line': {'color': "red", 'width': 4},
+                    'thickness': 0.75,
+                    'value': meta_mensal
+                }
             }
-        }
-    ))
-    st.plotly_chart(fig, use_container_width=True)
-    
-    if percentual_gasto > 100:
-        st.error(f"⚠️ Você ultrapassou sua meta em {percentual_gasto - 100:.1f}%!")
-    elif percentual_gasto > 80:
-        st.warning(f"⚠️ Atenção! Você já gastou {percentual_gasto:.1f}% da sua meta.")
-    else:
-        st.success(f"✅ Você gastou {percentual_gasto:.1f}% da sua meta. Continue assim!")
+        ))
+        st.plotly_chart(fig, use_container_width=True)
 
-with col2:
-    # Projeção para final do mês
-    if 'Data' in df_filtrado.columns and len(df_filtrado) > 0:
-        dias_decorridos = df_filtrado['Data'].dt.day.max()
+        if percentual_gasto > 100:
+            st.error(f"⚠️ Você ultrapassou sua meta em {percentual_gasto - 100:.1f}%!")
+        elif percentual_gasto > 80:
+            st.warning(f"⚠️ Atenção! Você já gastou {percentual_gasto:.1f}% da sua meta.")
+        else:
+            st.success(f"✅ Você gastou {percentual_gasto:.1f}% da sua meta. Continue assim!")
+
+    with col2:
+        # Projeção para final do mês (último dia com lançamento, em cache por filtro)
+        dias_decorridos = derivado_por_chave('secao_metas', chave_filtro,
+                                             lambda: _dias_decorridos(filtro), COLUNAS_DASHBOARD)
         dias_mes = 30  # Simplificação
-        
-        if dias_decorridos > 0:
+
+        if dias_decorridos is not None and dias_decorridos > 0:
             gasto_diario_medio = total_gasto / dias_decorridos
             projecao_mes = gasto_diario_medio * dias_mes
-            
+
             st.metric(
                 label="📊 Projeção para o Mês",
                 value=f"R$ {projecao_mes:,.2f}",
                 delta=f"{((projecao_mes - meta_mensal) / meta_mensal * 100):+.1f}% vs Meta"
             )
-            
+
             st.metric(
                 label="📅 Gasto Médio Diário",
                 value=f"R$ {gasto_diario_medio:,.2f}"
             )
-            
+
             # Recomendação
             dias_restantes = dias_mes - dias_decorridos
             saldo_disponivel = meta_mensal - total_gasto
             gasto_diario_recomendado = saldo_disponivel / dias_restantes if dias_restantes > 0 else 0
-            
+
             if gasto_diario_recomendado > 0:
                 st.info(f"💡 Para não estourar a meta, gaste no máximo R$ {gasto_diario_recomendado:.2f}/dia nos próximos {dias_restantes} dias.")
             else:
                 st.warning(f"⚠️ Meta já ultrapassada! Tente economizar R$ {abs(gasto_diario_recomendado):.2f}/dia.")
 
-st.divider()
+
+with aba_metas:
+    if aba_metas.open:
+        secao_metas(chave_filtro, filtro, total_gasto)
+
 
 # ========================================
 # 7. ANÁLISE DETALHADA DE TRANSAÇÕES
 # ========================================
-st.subheader("🔍 Transações Detalhadas")
-
-# Filtros adicionais
-col1, col2, col3 = st.columns(3)
-with col1:
-    min_valor = st.number_input("Valor mínimo (R$)", min_value=0.0, value=0.0)
-with col2:
-    max_valor = st.number_input("Valor máximo (R$)", min_value=0.0, value=float(gastos_positivos['Valor (R$)'].max()))
-with col3:
-    busca = st.text_input("🔎 Buscar estabelecimento:")
+@st.fragment
+def secao_transacoes(filtro, fatura_selecionada, maior_compra):
+    st.subheader("🔍 Transações Detalhadas")
 
-# Aplicar filtros
-df_transacoes = gastos_positivos.copy()
-df_transacoes = df_transacoes[
-    (df_transacoes['Valor (R$)'] >= min_valor) &
-    (df_transacoes['Valor (R$)'] <= max_valor)
-]
+    # Filtros adicionais
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        min_valor = st.number_input("Valor mínimo (R$)", min_value=0.0, value=0.0)
+    with col2:
+        max_valor = st.number_input("Valor máximo (R$)", min_value=0.0, value=float(maior_compra))
+    with col3:
+        busca = st.text_input("🔎 Buscar estabelecimento:")
+        modo_busca = st.radio("Modo da busca", list(ROTULOS_BUSCA), horizontal=True, label_visibility="collapsed")
 
-if busca:
+    # Aplicar filtros
+    df_transacoes = indice.selecionar(df, positivos=True, **filtro)
     df_transacoes = df_transacoes[
-        df_transacoes['Descrição'].str.contains(busca, case=False, na=False)
+        (df_transacoes['Valor (R$)'] >= min_valor) &
+        (df_transacoes['Valor (R$)'] <= max_valor)
     ]
 
-# Exibir tabela
-st.dataframe(
-    df_transacoes[['Descrição', 'Valor (R$)', 'Categoria'] if 'Categoria' in df_transacoes.columns else ['Descrição', 'Valor (R$)']]
-    .sort_values('Valor (R$)', ascending=False)
-    .style.format({'Valor (R$)': 'R$ {:,.2f}'}),
-    use_container_width=True,
-    hide_index=True
-)
+    if busca:
+        # Índice de trigramas sobre as descrições distintas (texto literal, sem regex)
+        df_transacoes = indice_busca(COLUNAS_DASHBOARD).filtrar(df_transacoes, busca, ROTULOS_BUSCA[modo_busca])
+
+    # Exibir tabela (paginada: ordena pela ordem prévia da base e formata só a página visível)
+    exibir_tabela(df_transacoes, ['Descrição', 'Valor (R$)', 'Categoria'], "transacoes", ordem_base(COLUNAS_DASHBOARD))
+
+    # Botão de download (o arquivo só é gerado no clique e fica em cache por filtro)
+    chave_exportacao = (filtro['arquivo'], filtro['categoria'], min_valor, max_valor, busca, modo_busca)
+    botao_exportacao(df_transacoes, chave_exportacao, f"transacoes_{fatura_selecionada.replace(' ', '_')}", COLUNAS_DASHBOARD)
+
 
-# Botão de download
-csv = df_transacoes.to_csv(index=False).encode('utf-8')
-st.download_button(
-    label="📥 Baixar dados filtrados (CSV)",
-    data=csv,
-    file_name=f"transacoes_{fatura_selecionada.replace(' ', '_')}.csv",
-    mime="text/csv"
-)
\ No newline at end of file
+with aba_transacoes:
+    if aba_transacoes.open:
+        secao_transacoes(filtro, fatura_selecionada, maior_compra)
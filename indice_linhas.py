@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+from cache_dados import derivado
+from esquema import COLUNA_VALOR
+
+# =================================================================
+# ÍNDICE POSICIONAL DA BASE (FATURA, CATEGORIA, GASTO POSITIVO)
+# =================================================================
+# Montado uma vez por versão da base: para cada valor de Arquivo e de
+# Categoria, as posições (inteiros, em ordem crescente) das linhas que o
+# têm, e o mesmo para as linhas com valor > 0. Um filtro combinado parte da
+# menor lista de posições e a intersecta com os demais critérios olhando só
+# essas linhas (código da categoria / sinal do valor), então selecionar uma
+# fatura custa o tamanho da fatura, não o da base.
+
+COLUNAS_INDICE = ['Arquivo', 'Categoria']
+_VAZIO = np.array([], dtype=np.intp)
+
+
+def _grupos(serie):
+    """Códigos por linha, posição de cada código nas categorias e posições por valor."""
+    categorico = serie.astype('category') if not isinstance(serie.dtype, pd.CategoricalDtype) else serie
+    codigos = categorico.cat.codes.to_numpy()
+    categorias = categorico.cat.categories
+
+    # Ordenação estável por código: cada grupo sai contíguo e em ordem de posição
+    ordem = np.argsort(codigos, kind='stable')
+    contagem = np.bincount(codigos[codigos >= 0], minlength=len(categorias))
+    fins = np.cumsum(contagem) + int((codigos < 0).sum())
+    grupos = {
+        valor: ordem[fim - qtd:fim]
+        for valor, qtd, fim in zip(categorias, contagem, fins) if qtd
+    }
+    return codigos, {valor: i for i, valor in enumerate(categorias)}, grupos
+
+
+class IndiceLinhas:
+    """
+    Posições das linhas de `df` por Arquivo, por Categoria e com valor > 0.
+    As posições valem para o próprio `df` (e cópias dele na mesma ordem).
+    """
+
+    def __init__(self, df, colunas=COLUNAS_INDICE):
+        self.linhas = len(df)
+        self.codigos = {}
+        self.codigo_de = {}
+        self.grupos = {}
+        for coluna in colunas:
+            if coluna in df.columns:
+                self.codigos[coluna], self.codigo_de[coluna], self.grupos[coluna] = _grupos(df[coluna])
+
+        self.positivo = (df[COLUNA_VALOR] > 0).to_numpy()
+        self.posicoes_positivas = np.flatnonzero(self.positivo)
+
+    def __repr__(self):
+        grupos = ', '.join(f"{coluna}: {len(g)}" for coluna, g in self.grupos.items())
+        return f"IndiceLinhas({self.linhas} linhas; {grupos}; {len(self.posicoes_positivas)} positivas)"
+
+    def valores(self, coluna):
+        """Valores presentes de uma coluna indexada (ordem das categorias)."""
+        return list(self.grupos.get(coluna, {}))
+
+    def posicoes(self, arquivo=None, categoria=None, positivos=False):
+        """
+        Posições (crescentes) das linhas que atendem aos filtros; None = sem
+        filtro. Filtro por coluna ausente na base é ignorado, como nos dashboards.
+        """
+        filtros = [(coluna, valor) for coluna, valor in (('Arquivo', arquivo), ('Categoria', categoria))
+                   if valor is not None and coluna in self.grupos]
+        candidatos = [self.grupos[coluna].get(valor, _VAZIO) for coluna, valor in filtros]
+        if positivos:
+            candidatos.append(self.posicoes_positivas)
+        if not candidatos:
+            return np.arange(self.linhas)
+
+        # Interseção: parte da menor lista e confere os outros critérios só nela
+        menor = int(np.argmin([len(c) for c in candidatos]))
+        posicoes = candidatos[menor]
+        for i, (coluna, valor) in enumerate(filtros):
+            if i != menor and len(posicoes):
+                posicoes = posicoes[self.codigos[coluna][posicoes] == self.codigo_de[coluna][valor]]
+        if positivos and menor != len(filtros) and len(posicoes):
+            posicoes = posicoes[self.positivo[posicoes]]
+        return posicoes
+
+    def selecionar(self, df, arquivo=None, categoria=None, positivos=False):
+        """Linhas de `df` que atendem aos filtros, na ordem original."""
+        return df.iloc[self.posicoes(arquivo, categoria, positivos)]
+
+
+def indice_base(colunas=None):
+    """Índice da base em cache (cache_dados), reconstruído só quando a base muda."""
+    return derivado('indice_linhas', IndiceLinhas, colunas)
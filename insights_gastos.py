@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+# =================================================================
+# MOTOR DE INSIGHTS (VARIAÇÃO ENTRE FATURAS)
+# =================================================================
+# Em vez de filtrar as linhas uma vez por categoria, cada nível (total,
+# Categoria, Descrição) vira um único pivô chave x fatura a partir do cubo
+# (cubo_gastos.py). A variação de todas as chaves contra a fatura anterior
+# sai de uma operação sobre a matriz, e as regras são expressões avaliadas
+# de uma vez sobre a tabela (DataFrame.eval), com limiares configuráveis
+# (@nome nas expressões). O resultado é uma lista de insights ordenada por
+# impacto (variação absoluta em R$).
+# Níveis ausentes no cubo (ex.: Categoria) são ignorados.
+
+LIMIARES = {
+    'aumento_total_pct': 20,
+    'economia_total_pct': 20,
+    'alta_categoria_pct': 50,
+    'alta_estabelecimento_pct': 100,
+    'minimo_estabelecimento': 50.0,   # R$ na fatura anterior
+    'minimo_novo': 100.0,             # R$ na fatura atual
+}
+
+# nivel None = total da fatura; 'chave' nas mensagens é o valor do nível
+REGRAS = [
+    {
+        'regra': 'aumento_total', 'nivel': None, 'tipo': '📈 Aumento Significativo',
+        'condicao': 'anterior > 0 and variacao_pct > @aumento_total_pct',
+        'mensagem': 'Seus gastos em {fatura} aumentaram {variacao_pct:.1f}% em relação à fatura anterior',
+    },
+    {
+        'regra': 'economia_total', 'nivel': None, 'tipo': '📉 Economia',
+        'condicao': 'anterior > 0 and variacao_pct < -@economia_total_pct',
+        'mensagem': 'Parabéns! Em {fatura} você economizou {queda_pct:.1f}% em relação à fatura anterior',
+    },
+    {
+        'regra': 'categoria_em_alta', 'nivel': 'Categoria', 'tipo': '🔥 Categoria em Alta',
+        'condicao': 'anterior > 0 and variacao_pct > @alta_categoria_pct',
+        'mensagem': 'Gastos com "{chave}" aumentaram {variacao_pct:.1f}% em {fatura}',
+    },
+    {
+        'regra': 'estabelecimento_em_alta', 'nivel': 'Descrição', 'tipo': '🔥 Estabelecimento em Alta',
+        'condicao': 'anterior >= @minimo_estabelecimento and variacao_pct > @alta_estabelecimento_pct',
+        'mensagem': 'Gastos em "{chave}" aumentaram {variacao_pct:.1f}% em {fatura} (R$ {anterior:,.2f} → R$ {atual:,.2f})',
+    },
+    {
+        'regra': 'novo_estabelecimento', 'nivel': 'Descrição', 'tipo': '🆕 Novo Gasto Relevante',
+        'condicao': 'anterior == 0 and atual >= @minimo_novo',
+        'mensagem': '"{chave}" apareceu em {fatura} com R$ {atual:,.2f}',
+    },
+]
+
+
+def variacoes(cubo, nivel, ordem_faturas):
+    """
+    Total de cada chave do `nivel` (None = total) em cada fatura e na fatura
+    anterior de `ordem_faturas`, em formato longo: chave, fatura, atual,
+    anterior, delta, variacao_pct, queda_pct e tem_anterior (R$).
+    """
+    ordem_faturas = list(ordem_faturas)
+    if nivel is None:
+        somas = cubo.groupby('Arquivo', observed=True)['soma_centavos'].sum()
+        pivo = somas.to_frame('Total').T
+    else:
+        somas = cubo.groupby([nivel, 'Arquivo'], observed=True)['soma_centavos'].sum()
+        pivo = somas.unstack('Arquivo', fill_value=0)
+    pivo = pivo.reindex(columns=ordem_faturas, fill_value=0)
+
+    atual = pivo.to_numpy(dtype='float64') / 100
+    anterior = np.zeros_like(atual)
+    anterior[:, 1:] = atual[:, :-1]
+    delta = atual - anterior
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacao_pct = np.where(anterior > 0, delta / anterior * 100, np.nan)
+
+    n_chaves, n_faturas = atual.shape
+    return pd.DataFrame({
+        'chave': np.repeat(np.asarray(pivo.index, dtype=object), n_faturas),
+        'fatura': np.tile(np.asarray(ordem_faturas, dtype=object), n_chaves),
+        'atual': atual.ravel(),
+        'anterior': anterior.ravel(),
+        'delta': delta.ravel(),
+        'variacao_pct': variacao_pct.ravel(),
+        'queda_pct': -variacao_pct.ravel(),
+        'tem_anterior': np.tile(np.arange(n_faturas) > 0, n_chaves),
+    })
+
+
+def gerar_insights(cubo, ordem_faturas, fatura=None, regras=REGRAS, limiares=LIMIARES, maximo=10):
+    """
+    Insights da `fatura` contra a anterior em `ordem_faturas` (None = a mais
+    recente), do maior para o menor impacto. Cada insight é um dict com
+    'tipo', 'mensagem', 'detalhes' (None), 'regra', 'fatura' e 'impacto'.
+    """
+    ordem_faturas = list(ordem_faturas)
+    if not ordem_faturas or len(cubo) == 0:
+        return []
+    fatura = ordem_faturas[-1] if fatura is None else fatura
+    if fatura not in ordem_faturas:
+        return []
+    limiares = {**LIMIARES, **limiares}
+
+    # Um pivô por nível usado pelas regras
+    niveis = {regra['nivel'] for regra in regras if regra['nivel'] is None or regra['nivel'] in cubo.columns}
+    tabelas = {}
+    for nivel in niveis:
+        tabela = variacoes(cubo, nivel, ordem_faturas)
+        tabelas[nivel] = tabela[(tabela['fatura'] == fatura).to_numpy() & tabela['tem_anterior'].to_numpy()]
+
+    insights = []
+    for regra in regras:
+        tabela = tabelas.get(regra['nivel'])
+        if tabela is None or tabela.empty:
+            continue
+        disparadas = tabela[tabela.eval(regra['condicao'], local_dict=limiares).to_numpy(dtype=bool)]
+        for linha in disparadas.to_dict('records'):
+            insights.append({
+                'tipo': regra['tipo'],
+                'mensagem': regra['mensagem'].format(**linha),
+                'detalhes': None,
+                'regra': regra['regra'],
+                'fatura': fatura,
+                'impacto': abs(linha['delta']),
+            })
+
+    insights.sort(key=lambda insight: insight['impacto'], reverse=True)
+    return insights[:maximo]
@@ -0,0 +1,117 @@
+import unicodedata
+from collections import deque
+
+# =================================================================
+# DETECÇÃO DE INTENÇÕES DO ASSISTENTE (AUTÔMATO DE FRASES)
+# =================================================================
+# Todas as frases de todas as intenções são compiladas uma vez num autômato
+# Aho-Corasick sobre o texto sem acentos e em minúsculas ("médio" casa com
+# "medio"). Uma passada pela pergunta encontra todas as frases presentes,
+# qualquer que seja o tamanho da tabela. Cada intenção pontua a soma dos
+# tamanhos das frases distintas encontradas (frase mais longa = mais
+# específica), então "qual categoria gasto mais" fica com "categoria" e não
+# com "maior_gasto", que também casa "gasto mais". No empate vale a ordem
+# de INTENCOES.
+# Para acrescentar frases basta editar INTENCOES (ou montar um
+# AutomatoFrases próprio com outra tabela).
+
+INTENCAO_DESCONHECIDA = "desconhecido"
+
+INTENCOES = {
+    "maior_gasto": ["onde gasto mais", "maior gasto", "gasto mais", "quem recebe mais dinheiro"],
+    "total": ["total", "quanto gastei", "valor total", "gasto total"],
+    "media": ["media", "médio", "ticket medio"],
+    "contagem": ["quantas compras", "quantas transações", "quantidade"],
+    "score": ["score", "nota financeira"],
+    "risco": ["risco", "perigo financeiro"],
+    "economizar": ["economizar", "como economizar", "reduzir gastos"],
+    "previsao": ["previsão", "projeção", "quanto vou gastar"],
+    "categoria": ["categoria", "qual categoria gasto mais"],
+}
+
+
+def dobrar_acentos(texto):
+    """Minúsculas e sem acentos: 'Previsão Média' -> 'previsao media'."""
+    decomposto = unicodedata.normalize('NFKD', str(texto).casefold())
+    return ''.join(c for c in decomposto if not unicodedata.combining(c))
+
+
+class AutomatoFrases:
+    """Autômato Aho-Corasick sobre as frases de uma tabela intenção -> frases."""
+
+    def __init__(self, intencoes=INTENCOES):
+        self._ordem = {intencao: i for i, intencao in enumerate(intencoes)}
+        self._transicoes = [{}]
+        self._falha = [0]
+        self._saidas = [[]]   # (intenção, frase) terminando em cada estado
+        self._frases = 0      # frases inseridas (as saídas herdadas dos links repetem frases)
+
+        # Trie das frases
+        for intencao, frases in intencoes.items():
+            for frase in frases:
+                frase = dobrar_acentos(frase)
+                if not frase:
+                    continue
+                estado = 0
+                for c in frase:
+                    proximo = self._transicoes[estado].get(c)
+                    if proximo is None:
+                        proximo = len(self._transicoes)
+                        self._transicoes[estado][c] = proximo
+                        self._transicoes.append({})
+                        self._falha.append(0)
+                        self._saidas.append([])
+                    estado = proximo
+                self._saidas[estado].append((intencao, frase))
+                self._frases += 1
+
+        # Links de falha em largura (filhos da raiz falham para a raiz); cada
+        # estado herda as saídas do seu link
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for c, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and c not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                self._falha[proximo] = self._transicoes[falha].get(c, 0)
+                self._saidas[proximo] = self._saidas[proximo] + self._saidas[self._falha[proximo]]
+
+    def __len__(self):
+        return self._frases
+
+    def encontrar(self, texto):
+        """Frases presentes em `texto`: lista de (intenção, frase, início), na ordem do texto."""
+        texto = dobrar_acentos(texto)
+        encontradas = []
+        estado = 0
+        for i, c in enumerate(texto):
+            while estado and c not in self._transicoes[estado]:
+                estado = self._falha[estado]
+            estado = self._transicoes[estado].get(c, 0)
+            for intencao, frase in self._saidas[estado]:
+                encontradas.append((intencao, frase, i - len(frase) + 1))
+        return encontradas
+
+    def pontuar(self, texto):
+        """Intenções presentes em `texto` com a pontuação, da maior para a menor."""
+        frases = {}
+        for intencao, frase, _ in self.encontrar(texto):
+            frases.setdefault(intencao, set()).add(frase)
+        pontos = {intencao: sum(len(f) for f in encontradas) for intencao, encontradas in frases.items()}
+        return sorted(pontos.items(), key=lambda item: (-item[1], self._ordem[item[0]]))
+
+
+_AUTOMATO = AutomatoFrases(INTENCOES)
+
+
+def detectar_intencoes(texto, automato=_AUTOMATO):
+    """Todas as intenções da pergunta com pontuação: [(intenção, pontos), ...]."""
+    return automato.pontuar(texto)
+
+
+def detectar_intencao(texto, automato=_AUTOMATO):
+    """Intenção de maior pontuação, ou INTENCAO_DESCONHECIDA."""
+    pontuadas = automato.pontuar(texto)
+    return pontuadas[0][0] if pontuadas else INTENCAO_DESCONHECIDA
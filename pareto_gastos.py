@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+import cubo_gastos
+from cache_dados import derivado_por_chave
+from esquema import COLUNA_VALOR
+
+# =================================================================
+# PARETO DOS ESTABELECIMENTOS (TOP-K COM CACHE POR FILTRO)
+# =================================================================
+# O total por estabelecimento de um filtro (fatura, categoria) é somado uma
+# vez a partir do cubo e guardado num LRU que vive junto da versão da base
+# (cache_dados.derivado_por_chave): mudou a base, o LRU é descartado com ela.
+# Os consumidores (gráfico de concentração, Top 5, score, risco, assistente)
+# pedem só o que mostram: os k maiores saem por seleção parcial
+# (np.argpartition, O(n)) e só esses k são ordenados. A tabela completa
+# ordenada é calculada apenas se alguém pedir.
+
+MAXIMO_FILTROS = 32
+
+
+class Pareto:
+    """Totais por Descrição de um filtro, com top-k e participações acumuladas."""
+
+    def __init__(self, cubo):
+        descricao = cubo['Descrição']
+        if isinstance(descricao.dtype, pd.CategoricalDtype):
+            codigos, nomes = descricao.cat.codes.to_numpy(), descricao.cat.categories
+        else:
+            codigos, nomes = pd.factorize(descricao)
+        centavos = cubo['soma_centavos'].to_numpy()
+        # Descrição vazia (código -1, o cubo agrupa com dropna=False) fica fora
+        # dos estabelecimentos, mas entra no total, como em cubo_gastos.pareto
+        com_nome = codigos >= 0
+        # Soma dos centavos por estabelecimento (inteiros exatos até 2**53)
+        somas = np.bincount(codigos[com_nome], weights=centavos[com_nome], minlength=len(nomes))
+        qtd = np.bincount(codigos[com_nome], weights=cubo['qtd'].to_numpy()[com_nome], minlength=len(nomes))
+
+        presentes = np.flatnonzero(qtd > 0)
+        self.descricoes = np.asarray(nomes[presentes], dtype=object)
+        self.centavos = somas[presentes].astype(np.int64)
+        self.total_centavos = int(centavos.sum())
+        self._ordem = None
+        self._tabela = None
+
+    def __len__(self):
+        return len(self.descricoes)
+
+    def __repr__(self):
+        return f"Pareto({len(self)} estabelecimentos, total R$ {self.total:,.2f})"
+
+    @property
+    def total(self):
+        return self.total_centavos / 100
+
+    def _maiores(self, k):
+        """Posições dos k maiores totais, do maior para o menor (empate: ordem do nome)."""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.array([], dtype=np.intp)
+        if self._ordem is not None:
+            return self._ordem[:k]
+        if k < len(self):
+            candidatos = np.argpartition(-self.centavos, k - 1)[:k]
+        else:
+            candidatos = np.arange(len(self))
+        return candidatos[np.lexsort((candidatos, -self.centavos[candidatos]))]
+
+    def top(self, k=10):
+        """Os k maiores: Descrição, 'Valor (R$)', '%' e '%_acumulado' (sobre o total do filtro)."""
+        if self._tabela is not None:
+            return self._tabela.head(k)
+        posicoes = self._maiores(k)
+        tabela = pd.DataFrame({
+            'Descrição': self.descricoes[posicoes],
+            COLUNA_VALOR: self.centavos[posicoes] / 100,
+        })
+        tabela['%'] = tabela[COLUNA_VALOR] / self.total * 100 if self.total_centavos else 0.0
+        tabela['%_acumulado'] = tabela['%'].cumsum()
+        return tabela
+
+    def participacao(self, k):
+        """% do total concentrado nos k maiores estabelecimentos."""
+        if not self.total_centavos:
+            return 0.0
+        return int(self.centavos[self._maiores(k)].sum()) / self.total_centavos * 100
+
+    def maior(self):
+        """Linha do maior estabelecimento (Series) ou None se o filtro não tem gastos."""
+        top = self.top(1)
+        return top.iloc[0] if len(top) else None
+
+    def tabela(self):
+        """Tabela completa ordenada, como cubo_gastos.pareto (calculada uma vez)."""
+        if self._tabela is None:
+            self._ordem = self._maiores(len(self)) if len(self) else np.array([], dtype=np.intp)
+            self._tabela = self.top(len(self))
+        return self._tabela
+
+
+def pareto_filtro(colunas=None, arquivo=None, categoria=None):
+    """
+    Pareto do filtro (None = todos), servido de um LRU de até MAXIMO_FILTROS
+    filtros por versão da base. Quem usa não deve alterar o resultado.
+    """
+    def construir():
+        cubo = cubo_gastos.filtrar(cubo_gastos.cubo_base(colunas), arquivo=arquivo, categoria=categoria)
+        return Pareto(cubo)
+
+    return derivado_por_chave('pareto_gastos', (arquivo, categoria), construir, colunas, MAXIMO_FILTROS)
+
+
+# ----------------- VERIFICAÇÃO RÁPIDA -----------------
+# Descrição vazia em algumas linhas: mesmo resultado de cubo_gastos.pareto
+if __name__ == '__main__':
+    from cache_dados import preparar_base
+    from esquema import aplicar_esquema
+
+    base = preparar_base(aplicar_esquema(pd.DataFrame({
+        'Data': ['2025-01-10', '2025-01-11', '2025-02-12', '2025-02-13', '2025-03-14'],
+        'Arquivo': ['fatura-fev.pdf'] * 2 + ['fatura-mar.pdf'] * 3,
+        'Descrição': ['IFOOD', None, 'UBER', 'IFOOD', None],
+        'Valor (R$)': [10.0, 99.0, 20.0, 30.0, 1.0],
+    })))
+    cubo = cubo_gastos.montar_cubo(base)
+    pareto = Pareto(cubo)
+    esperado = cubo_gastos.pareto(cubo)
+    assert list(pareto.top(10)['Descrição']) == list(esperado['Descrição']) == ['IFOOD', 'UBER'], pareto.top(10)
+    assert np.allclose(pareto.top(10)['%'], esperado['%']), (pareto.top(10), esperado)
+    assert pareto.total == 160.0, pareto.total
+    print("ok:", pareto)
@@ -0,0 +1,215 @@
+import argparse
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from armazenamento import ARQUIVO_CSV, DIRETORIO_PARQUET
+from cache_dados import carregar_base
+from cache_respostas import CacheRespostas, estatisticas
+from consultas import MotorConsultas, planejar
+from cubo_gastos import montar_cubo
+from entidades import IndiceEntidades
+from intencoes import detectar_intencao
+from periodos_fatura import PeriodosFatura
+from respostas_intencoes import IndicadoresFiltro, executar_intencao
+
+# =================================================================
+# PERGUNTAS EM LOTE (SEM STREAMLIT)
+# =================================================================
+# Responde um arquivo de perguntas com a mesma lógica do agente local do
+# dashboard-ask.py (consultas.planejar + MotorConsultas); a pergunta que não
+# vira consulta (ex.: "qual meu score") é respondida pela intenção, como no
+# dashboard-ask-2.py (intencoes.detectar_intencao + respostas_intencoes.py).
+# A base é carregada uma vez e o motor, o índice de entidades, o cubo e a
+# tabela de períodos são montados uma vez por processo. Perguntas que viram o
+# mesmo plano (ou a mesma intenção) com o mesmo filtro reaproveitam o
+# resultado, e os indicadores de cada filtro são calculados uma vez
+# (CacheRespostas, sem validade).
+# Entrada: JSONL, uma pergunta por linha:
+#   {"id": 1, "pergunta": "quanto gastei no ifood por semana", "fatura": "fatura-maio.pdf", "categoria": null}
+#   (fatura e categoria são opcionais; sem eles = "Resumo Total" / "Todas")
+# Saída: JSONL na mesma ordem, com intenção, plano, resposta e tabela (ou erro).
+# Uso: python perguntas_lote.py perguntas.jsonl [-o respostas.jsonl] [--workers 4] [--processos]
+# Para várias bases (um titular por base), rode uma vez por --csv/--parquet.
+
+COLUNAS_LOTE = ['MES_FATURA', 'SEMANA_FATURA', 'Data', 'Arquivo', 'Descrição', 'Valor (R$)', 'Categoria']
+WORKERS = 4
+TAMANHO_LOTE = 16  # perguntas por tarefa no modo com processos
+
+_contexto = {}  # por processo: motor, entidades, cubo, períodos e cache de resultados
+
+
+def _iniciar(colunas, origem_parquet, origem_csv):
+    """Carrega a base e monta motor/índices (uma vez por processo)."""
+    base = carregar_base(colunas, origem_parquet=origem_parquet, origem_csv=origem_csv)
+    _contexto['motor'] = MotorConsultas(base)
+    _contexto['entidades'] = IndiceEntidades(base)
+    _contexto['cubo'] = montar_cubo(base)
+    _contexto['periodos'] = PeriodosFatura(base)
+    _contexto['resultados'] = CacheRespostas(validade=math.inf)
+
+
+def _para_json(tabela):
+    if tabela is None:
+        return None
+    registros = tabela.astype(object).where(tabela.notna(), None).to_dict('records')
+    return [{coluna: valor.item() if isinstance(valor, np.generic) else valor for coluna, valor in registro.items()}
+            for registro in registros]
+
+
+def _indicadores(arquivo, categoria):
+    """IndicadoresFiltro do filtro (calculados uma vez por processo)."""
+    def construir():
+        motor = _contexto['motor']
+        positivos = motor.indice.posicoes(arquivo, categoria, positivos=True)
+        return IndicadoresFiltro(_contexto['cubo'], _contexto['periodos'], motor.valores[positivos],
+                                 arquivo=arquivo, categoria=categoria)
+
+    return _contexto['resultados'].obter(('indicadores', arquivo, categoria), construir)
+
+
+def responder(item):
+    """Resposta de um item da entrada ({'pergunta', 'fatura', 'categoria', ...})."""
+    if 'erro' in item:  # linha inválida na entrada (ler_perguntas)
+        return item
+    inicio = time.perf_counter()
+    pergunta = item.get('pergunta') or ''
+    filtro = {'arquivo': item.get('fatura'), 'categoria': item.get('categoria')}
+    saida = {'id': item.get('id'), 'pergunta': pergunta, 'fatura': filtro['arquivo'], 'categoria': filtro['categoria']}
+    try:
+        motor = _contexto['motor']
+        plano = planejar(pergunta, _contexto['entidades'], motor.ultimos_meses)
+        intencao = detectar_intencao(pergunta)
+        if plano.operacao is None:
+            # Sem consulta: mesma resposta do assistente do dashboard-ask-2.py
+            resposta, tabela = _contexto['resultados'].obter(
+                ('intencao', intencao, filtro['arquivo'], filtro['categoria']),
+                lambda: (executar_intencao(intencao, _indicadores(**filtro)), None)
+            )
+        else:
+            resposta, tabela = _contexto['resultados'].obter(
+                (plano.chave(), filtro['arquivo'], filtro['categoria']),
+                lambda: motor.executar(plano, **filtro)
+            )
+        saida.update({
+            'intencao': intencao,
+            'plano': {'operacao': plano.operacao, 'entidades': [list(e) for e in plano.entidades],
+                      'periodo': list(plano.periodo) if plano.periodo else None, 'agrupar_por': plano.agrupar_por},
+            'resposta': resposta,
+            'tabela': _para_json(tabela),
+        })
+    except Exception as erro:  # uma pergunta ruim não derruba o lote
+        saida['erro'] = f"{type(erro).__name__}: {erro}"
+    saida['segundos'] = round(time.perf_counter() - inicio, 6)
+    return saida
+
+
+def _diferenca(antes, depois):
+    return {chave: depois[chave] - antes.get(chave, 0) for chave in depois}
+
+
+def _responder_lote(itens):
+    antes = estatisticas()
+    respostas = [responder(item) for item in itens]
+    return respostas, _diferenca(antes, estatisticas())
+
+
+def ler_perguntas(arquivo):
+    """
+    Itens do JSONL (linhas vazias ignoradas; linha com texto solto vira a
+    pergunta). Linha inválida não derruba o lote: vira {'id': número, 'erro'},
+    que sai na resposta e conta como erro.
+    """
+    itens = []
+    with open(arquivo, encoding='utf-8') as f:
+        for numero, linha in enumerate(f, 1):
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                item = json.loads(linha)
+            except json.JSONDecodeError as erro:
+                itens.append({'id': numero, 'erro': f"JSON inválido na linha {numero}: {erro}"})
+                continue
+            if isinstance(item, str):
+                item = {'pergunta': item}
+            elif not isinstance(item, dict):
+                itens.append({'id': numero, 'erro': f"Linha {numero}: esperado objeto ou texto, veio {type(item).__name__}"})
+                continue
+            item.setdefault('id', numero)
+            itens.append(item)
+    return itens
+
+
+def executar_lote(itens, workers=WORKERS, processos=False, colunas=COLUNAS_LOTE,
+                  origem_parquet=DIRETORIO_PARQUET, origem_csv=ARQUIVO_CSV):
+    """
+    Respostas na ordem dos itens e estatísticas do cache de resultados.
+    Com `processos`, cada processo carrega a base uma vez e recebe as
+    perguntas em lotes; senão, as threads compartilham a base deste processo.
+    """
+    if not processos:
+        _iniciar(colunas, origem_parquet, origem_csv)
+        antes = estatisticas()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            respostas = list(executor.map(responder, itens))
+        return respostas, _diferenca(antes, estatisticas())
+
+    lotes = [itens[i:i + TAMANHO_LOTE] for i in range(0, len(itens), TAMANHO_LOTE)]
+    respostas, cache = [], {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar,
+                             initargs=(colunas, origem_parquet, origem_csv)) as executor:
+        for parte, contadores in executor.map(_responder_lote, lotes):
+            respostas.extend(parte)
+            cache = {chave: valor + cache.get(chave, 0) for chave, valor in contadores.items()}
+    return respostas, cache
+
+
+def _argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Responde um arquivo de perguntas (JSONL) sobre os gastos, sem Streamlit")
+    parser.add_argument('entrada', help="JSONL com uma pergunta por linha")
+    parser.add_argument('-o', '--saida', default='-', help="JSONL de respostas (padrão: saída padrão)")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="threads ou processos (padrão: %(default)s)")
+    parser.add_argument('--processos', action='store_true', help="usa processos em vez de threads")
+    parser.add_argument('--csv', default=ARQUIVO_CSV, help="CSV final da ETL (padrão: %(default)s)")
+    parser.add_argument('--parquet', default=DIRETORIO_PARQUET, help="dataset Parquet, usado se existir (padrão: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _argumentos(argv)
+    try:
+        itens = ler_perguntas(args.entrada)
+    except FileNotFoundError:
+        print(f"ERRO: Arquivo de perguntas '{args.entrada}' não encontrado.", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    respostas, cache = executar_lote(itens, args.workers, args.processos,
+                                     origem_parquet=args.parquet, origem_csv=args.csv)
+    segundos = time.perf_counter() - inicio
+
+    saida = sys.stdout if args.saida == '-' else open(args.saida, 'w', encoding='utf-8')
+    try:
+        for resposta in respostas:
+            saida.write(json.dumps(resposta, ensure_ascii=False) + '\n')
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+    erros = sum('erro' in resposta for resposta in respostas)
+    vazao = len(respostas) / segundos if segundos > 0 else float('inf')
+    print(f"{len(respostas)} perguntas em {segundos:.2f}s ({vazao:,.1f} perguntas/s, "
+          f"{'processos' if args.processos else 'threads'}: {args.workers}); {erros} com erro; "
+          f"cache de resultados: {cache.get('acertos', 0)} acertos, {cache.get('faltas', 0)} faltas",
+          file=sys.stderr)
+    return 1 if erros else 0
+
+
+# ----------------- INÍCIO DA EXECUÇÃO -----------------
+if __name__ == '__main__':
+    sys.exit(main())
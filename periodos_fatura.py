@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from cache_dados import derivado
+from esquema import COLUNA_CENTAVOS, COLUNA_VALOR
+
+# =================================================================
+# TABELA DE PERÍODOS (UMA LINHA POR FATURA, NA ORDEM DO CICLO)
+# =================================================================
+# Montada uma vez por versão da base (cache_dados.derivado). Cada fatura
+# (Arquivo) fica no ciclo MES_FATURA da maioria dos seus lançamentos (parcelas
+# antigas caem em ciclos anteriores; empate = o ciclo mais recente) e as
+# faturas são ordenadas por esse ciclo, não pelo nome do arquivo (em ordem
+# alfabética fatura-abr viria antes de fatura-jan). Por fatura: total, qtd,
+# ticket médio e maior gasto positivo, variação contra a fatura anterior,
+# média móvel de 3 e o total por Categoria (se houver). Fatura anterior,
+# variação e evolução viram consultas diretas à tabela.
+
+JANELA_MEDIA_MOVEL = 3
+
+
+def _ciclo_por_fatura(base):
+    """MES_FATURA predominante de cada Arquivo (categorias de Arquivo -> rótulo)."""
+    arquivos = base['Arquivo'].cat.categories
+    if 'MES_FATURA' not in base.columns:
+        return pd.Series(pd.NA, index=arquivos, dtype=object)
+    contagem = base.groupby(['Arquivo', 'MES_FATURA'], observed=True).size().reset_index(name='n')
+    # Mais lançamentos primeiro; no empate, o ciclo mais recente (rótulos AAAA-MM ordenam no tempo)
+    contagem = contagem.sort_values(['n', 'MES_FATURA'], ascending=False, kind='stable')
+    ciclos = contagem.drop_duplicates('Arquivo').set_index('Arquivo')['MES_FATURA']
+    return ciclos.astype(object).reindex(arquivos)
+
+
+class PeriodosFatura:
+    """Totais por fatura na ordem do ciclo, com fatura anterior e variação em O(1)."""
+
+    def __init__(self, base):
+        arquivo = base['Arquivo']
+        if not isinstance(arquivo.dtype, pd.CategoricalDtype):
+            base = base.assign(Arquivo=arquivo.astype('category'))
+            arquivo = base['Arquivo']
+        arquivos = arquivo.cat.categories
+        codigos = arquivo.cat.codes.to_numpy()
+
+        # Gastos positivos somados por código da fatura (centavos exatos)
+        positivo = (base[COLUNA_VALOR] > 0).to_numpy() & (codigos >= 0)
+        cod_pos = codigos[positivo]
+        centavos = base[COLUNA_CENTAVOS].to_numpy()[positivo]
+        soma = np.bincount(cod_pos, weights=centavos, minlength=len(arquivos)).astype(np.int64)
+        qtd = np.bincount(cod_pos, minlength=len(arquivos))
+        maior = np.zeros(len(arquivos))
+        np.maximum.at(maior, cod_pos, base[COLUNA_VALOR].to_numpy()[positivo])
+
+        tabela = pd.DataFrame({
+            'Arquivo': np.asarray(arquivos, dtype=object),
+            'MES_FATURA': _ciclo_por_fatura(base).to_numpy(),
+            'soma_centavos': soma,
+            'Qtd': qtd,
+            'Maior': maior,
+        })
+        tabela = tabela[tabela['Arquivo'].isin(arquivo.unique())]
+        tabela = tabela.sort_values(['MES_FATURA', 'Arquivo'], na_position='first', kind='stable').reset_index(drop=True)
+
+        tabela.insert(2, COLUNA_VALOR, tabela['soma_centavos'] / 100)
+        tabela['Ticket_Medio'] = np.where(tabela['Qtd'] > 0, tabela[COLUNA_VALOR] / tabela['Qtd'].clip(lower=1), 0.0)
+        tabela['Variacao_%'] = tabela[COLUNA_VALOR].pct_change() * 100
+        tabela['Media_Movel_3'] = tabela[COLUNA_VALOR].rolling(window=JANELA_MEDIA_MOVEL, min_periods=1).mean()
+        self.tabela = tabela
+        self.ordem = tabela['Arquivo'].tolist()
+        self.posicao = {fatura: i for i, fatura in enumerate(self.ordem)}
+
+        # Total por categoria: matriz fatura (na ordem acima) x Categoria, em centavos
+        self.categorias = None
+        if 'Categoria' in base.columns:
+            por_categoria = (
+                base.loc[positivo, ['Arquivo', 'Categoria', COLUNA_CENTAVOS]]
+                .groupby(['Arquivo', 'Categoria'], observed=True)[COLUNA_CENTAVOS].sum()
+                .unstack('Categoria', fill_value=0)
+            )
+            self.categorias = por_categoria.reindex(self.ordem, fill_value=0)
+
+    def __len__(self):
+        return len(self.ordem)
+
+    def __repr__(self):
+        return f"PeriodosFatura({len(self)} faturas: {', '.join(self.ordem[:3])}{'...' if len(self) > 3 else ''})"
+
+    def anterior(self, fatura):
+        """Fatura imediatamente anterior no ciclo, ou None."""
+        i = self.posicao.get(fatura)
+        return self.ordem[i - 1] if i else None
+
+    def total(self, fatura, categoria=None):
+        """Total (R$) dos gastos positivos da fatura, opcionalmente de uma categoria."""
+        i = self.posicao.get(fatura)
+        if i is None:
+            return 0.0
+        if categoria is None:
+            return int(self.tabela['soma_centavos'].iat[i]) / 100
+        if self.categorias is None or categoria not in self.categorias.columns:
+            return 0.0
+        return int(self.categorias[categoria].iat[i]) / 100
+
+    def variacao(self, fatura, categoria=None):
+        """% contra a fatura anterior (0 se não houver anterior ou ela estiver zerada)."""
+        anterior = self.anterior(fatura)
+        if anterior is None:
+            return 0
+        total_anterior = self.total(anterior, categoria)
+        if total_anterior <= 0:
+            return 0
+        return (self.total(fatura, categoria) - total_anterior) / total_anterior * 100
+
+    def evolucao(self):
+        """Tabela de evolução dos dashboards: Fatura, Total, Qtd, Ticket_Medio, Variacao_% e Media_Movel_3."""
+        evolucao = self.tabela[['Arquivo', COLUNA_VALOR, 'Qtd', 'Ticket_Medio', 'Variacao_%', 'Media_Movel_3']]
+        return evolucao.rename(columns={'Arquivo': 'Fatura', COLUNA_VALOR: 'Total'})
+
+
+def periodos_base(colunas=None):
+    """Tabela de períodos da base em cache, recalculada só quando a base muda."""
+    return derivado('periodos_fatura', PeriodosFatura, colunas)
@@ -0,0 +1,124 @@
+import numpy as np
+
+import analises
+import cubo_gastos
+from esquema import COLUNA_VALOR
+from intencoes import INTENCOES
+from pareto_gastos import Pareto
+
+# =================================================================
+# RESPOSTAS DAS INTENÇÕES DO ASSISTENTE
+# =================================================================
+# Indicadores de um filtro (fatura, categoria) e a resposta de cada intenção
+# de intencoes.py, sem nada de Streamlit: o dashboard-ask-2.py (gráficos e
+# assistente) e o perguntas_lote.py (perguntas que não viram consulta) usam as
+# mesmas regras e dão as mesmas respostas. Tudo sai do cubo de agregados
+# (cubo_gastos.py), do pareto do filtro (pareto_gastos.py) e da tabela de
+# períodos (periodos_fatura.py); das linhas, só os valores positivos do
+# filtro, para contar os outliers do score.
+
+
+def score_financeiro(variacao, qtd_outliers, concentracao):
+    """Score de 0 a 100: perde pontos com alta contra a fatura anterior, outliers e concentração."""
+    score = 100
+    if variacao > 20:
+        score -= 15
+    if qtd_outliers > 0:
+        score -= 15
+    if concentracao > 40:
+        score -= 20
+    return max(score, 0)
+
+
+def nivel_risco(concentracao):
+    """'alto', 'moderado' ou 'baixo' pela % do maior estabelecimento."""
+    if concentracao > 50:
+        return "alto"
+    elif concentracao > 30:
+        return "moderado"
+    return "baixo"
+
+
+class IndicadoresFiltro:
+    """KPIs, pareto, variação, previsão, score e risco de um filtro."""
+
+    def __init__(self, cubo, periodos, valores_positivos, pareto=None, arquivo=None, categoria=None):
+        self.cubo = cubo_gastos.filtrar(cubo, arquivo=arquivo, categoria=categoria)
+        indicadores = cubo_gastos.kpis(self.cubo)
+        self.total = indicadores['total']
+        self.qtd = indicadores['qtd']
+        self.ticket_medio = indicadores['ticket_medio']
+
+        self.pareto = pareto if pareto is not None else Pareto(self.cubo)
+        self.concentracao = self.pareto.participacao(1)
+
+        # Comparação com a fatura anterior no ciclo (só com uma fatura escolhida)
+        self.variacao = periodos.variacao(arquivo, categoria) if arquivo is not None else 0
+        self.previsao = analises.previsao(periodos.tabela[['Arquivo', COLUNA_VALOR]])
+
+        # Média e desvio vêm do cubo; NaN (sem gastos) não conta outlier
+        limite = indicadores['media'] + 2 * indicadores['desvio']
+        self.qtd_outliers = int(np.count_nonzero(np.asarray(valores_positivos) > limite))
+        self.score = score_financeiro(self.variacao, self.qtd_outliers, self.concentracao)
+        self.risco = nivel_risco(self.concentracao)
+        self._por_categoria = None
+
+    def por_categoria(self):
+        """Total (R$) por categoria do filtro, ou None sem a coluna Categoria (calculado uma vez)."""
+        if self._por_categoria is None and 'Categoria' in self.cubo.columns:
+            self._por_categoria = cubo_gastos.por(self.cubo, 'Categoria')[COLUNA_VALOR]
+        return self._por_categoria
+
+
+def gerar_resposta_generica():
+    exemplos = ", ".join(f'"{frases[0]}"' for frases in INTENCOES.values())
+    return f"Não entendi a pergunta. Tente algo como: {exemplos}"
+
+
+def executar_intencao(intencao, indicadores):
+    """Resposta de `intencao` (intencoes.detectar_intencao) com os IndicadoresFiltro."""
+    if intencao in ("maior_gasto", "economizar"):
+        top = indicadores.pareto.maior()
+        if top is None:
+            return "Não há gastos nesse filtro"
+        if intencao == "maior_gasto":
+            return f"Você gasta mais em {top['Descrição']}, totalizando R$ {top[COLUNA_VALOR]:,.2f}"
+        economia = top[COLUNA_VALOR] * 0.2
+        return f"Se reduzir 20% dos gastos em {top['Descrição']}, economizaria R$ {economia:,.2f}"
+
+    elif intencao == "total":
+        return f"Seu gasto total foi R$ {indicadores.total:,.2f}"
+
+    elif intencao == "media":
+        return f"Seu gasto médio por compra é R$ {indicadores.ticket_medio:,.2f}"
+
+    elif intencao == "contagem":
+        return f"Você fez {indicadores.qtd} transações"
+
+    elif intencao == "score":
+        score = indicadores.score
+        if score >= 80:
+            nivel = "excelente"
+        elif score >= 60:
+            nivel = "bom"
+        else:
+            nivel = "precisa melhorar"
+        return f"Seu score financeiro é {score}/100, considerado {nivel}"
+
+    elif intencao == "risco":
+        if indicadores.risco == "alto":
+            return "Seu risco financeiro é alto devido à alta concentração de gastos"
+        return f"Seu risco financeiro é {indicadores.risco}"
+
+    elif intencao == "previsao":
+        return f"Sua previsão de gasto mensal é R$ {indicadores.previsao:,.2f}"
+
+    elif intencao == "categoria":
+        por_categoria = indicadores.por_categoria()
+        if por_categoria is None:
+            return "Seu dataset não possui categorias"
+        if por_categoria.empty:
+            return "Não há gastos nesse filtro"
+        return f"Sua categoria com maior gasto é {por_categoria.idxmax()}, com R$ {por_categoria.max():,.2f}"
+
+    return gerar_resposta_generica()
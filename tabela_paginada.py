@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cache_dados import derivado
+from esquema import COLUNA_DATA, COLUNA_VALOR
+
+# =================================================================
+# TABELA DE TRANSAÇÕES PAGINADA
+# =================================================================
+# Em vez de ordenar o recorte inteiro e formatar todas as células (Styler
+# gera HTML de cada uma), a tabela:
+# - usa uma ordem prévia da base por chave de ordenação (argsort estável,
+#   calculado uma vez por versão da base via cache_dados.derivado); um recorte
+#   da base sai ordenado filtrando essa ordem, sem novo sort
+# - fatia só a página visível e formata só ela
+# O custo de desenhar a tabela fica no tamanho da página, não do histórico.
+# As posições da base são os rótulos do índice (RangeIndex de carregar_base),
+# preservados por indice_linhas e pelos filtros com máscara.
+
+COLUNAS_ORDENACAO = [COLUNA_VALOR, COLUNA_DATA, 'Descrição']
+TAMANHOS_PAGINA = [25, 50, 100, 250]
+FORMATOS = {COLUNA_VALOR: 'R$ {:,.2f}'}
+
+
+def _chave_ordenacao(serie):
+    """Valores comparáveis da coluna (categorias viram a posição do rótulo em ordem alfabética)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories
+        posto = np.empty(len(categorias) + 1, dtype=np.int64)
+        posto[:-1] = np.argsort(np.argsort(categorias.astype(str), kind='stable'), kind='stable')
+        posto[-1] = len(categorias)  # vazio (código -1) por último
+        return posto[serie.cat.codes.to_numpy()]
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # Inteiros (ns) em vez de Timestamps com fuso; data vazia por último
+        valores = serie.array.asi8.copy()
+        valores[serie.isna().to_numpy()] = np.iinfo(np.int64).max
+        return valores
+    return serie.to_numpy()
+
+
+class OrdemPrevia:
+    """Posições da base ordenadas (crescente) por cada coluna de ordenação presente."""
+
+    def __init__(self, base, colunas=COLUNAS_ORDENACAO):
+        self.linhas = len(base)
+        self.ordens = {
+            coluna: np.argsort(_chave_ordenacao(base[coluna]), kind='stable')
+            for coluna in colunas if coluna in base.columns
+        }
+
+    def __repr__(self):
+        return f"OrdemPrevia({self.linhas} linhas; {', '.join(self.ordens)})"
+
+    def ordenar(self, rotulos, coluna, decrescente=False):
+        """`rotulos` (posições da base) na ordem da coluna."""
+        ordem = self.ordens[coluna]
+        marcados = np.zeros(self.linhas, dtype=bool)
+        marcados[rotulos] = True
+        ordenados = ordem[marcados[ordem]]
+        return ordenados[::-1] if decrescente else ordenados
+
+
+def ordem_base(colunas=None):
+    """Ordem prévia da base em cache, recalculada só quando a base muda."""
+    return derivado('tabela_paginada', OrdemPrevia, colunas)
+
+
+def _rotulos_ordenados(df, coluna, decrescente, ordem):
+    rotulos = df.index.to_numpy()
+    usa_ordem = (
+        ordem is not None and coluna in ordem.ordens
+        and pd.api.types.is_integer_dtype(df.index)
+        and (len(rotulos) == 0 or (rotulos.min() >= 0 and rotulos.max() < ordem.linhas))
+    )
+    # Recorte pequeno: ordenar o próprio recorte é mais barato que varrer a ordem da base
+    if usa_ordem and len(rotulos) * max(math.log2(len(rotulos) or 1), 1) >= ordem.linhas:
+        return ordem.ordenar(rotulos, coluna, decrescente), True
+    posicoes = np.argsort(_chave_ordenacao(df[coluna]), kind='stable')
+    return (posicoes[::-1] if decrescente else posicoes), False
+
+
+def pagina(df, coluna=COLUNA_VALOR, decrescente=True, tamanho=TAMANHOS_PAGINA[0], numero=1, ordem=None):
+    """
+    Linhas da página `numero` (1 = primeira) de `df` ordenado por `coluna`.
+    Devolve (página, total de linhas, total de páginas); `numero` fora do
+    intervalo é trazido para a primeira/última página.
+    """
+    total = len(df)
+    paginas = max(math.ceil(total / tamanho), 1)
+    numero = min(max(int(numero), 1), paginas)
+    inicio = (numero - 1) * tamanho
+
+    ordenados, sao_rotulos = _rotulos_ordenados(df, coluna, decrescente, ordem)
+    fatia = ordenados[inicio:inicio + tamanho]
+    return (df.loc[fatia] if sao_rotulos else df.iloc[fatia]), total, paginas
+
+
+def exibir_tabela(df, colunas, chave, ordem=None, formatos=FORMATOS):
+    """
+    Tabela paginada no Streamlit: ordenação, tamanho da página, página atual e
+    contagem de linhas. `chave` separa o estado de tabelas diferentes na página.
+    """
+    opcoes_ordem = [c for c in COLUNAS_ORDENACAO if c in df.columns]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        coluna = st.selectbox("Ordenar por", opcoes_ordem, key=f"{chave}_ordem")
+    with col2:
+        sentido = st.selectbox("Sentido", ["Decrescente", "Crescente"], key=f"{chave}_sentido")
+    with col3:
+        tamanho = st.selectbox("Linhas por página", TAMANHOS_PAGINA, key=f"{chave}_tamanho")
+    with col4:
+        numero = st.number_input("Página", min_value=1, value=1, step=1, key=f"{chave}_pagina")
+
+    visivel, total, paginas = pagina(df, coluna, sentido == "Decrescente", tamanho, numero, ordem)
+    numero = min(numero, paginas)
+
+    visivel = visivel[[c for c in colunas if c in visivel.columns]]
+    st.dataframe(
+        visivel.style.format({c: f for c, f in formatos.items() if c in visivel.columns}),
+        use_container_width=True,
+        hide_index=True
+    )
+    inicio = (numero - 1) * tamanho
+    st.caption(
+        f"Mostrando {min(inicio + 1, total):,}–{min(inicio + tamanho, total):,} de {total:,} transações "
+        f"(página {numero} de {paginas})".replace(',', '.')
+    )